@@ -1,3 +1,8 @@
+import atexit
+import json
+import os
+
+import click
 from ariadne import (
     MutationType,
     ObjectType,
@@ -7,13 +12,35 @@ from ariadne import (
     make_executable_schema,
 )
 from ariadne.explorer import ExplorerGraphiQL
-from data.migrate import migrate
+from graphql import GraphQLError
+from data.migrate import MigrationError, migrate
 from dotenv import load_dotenv
 from flask import Flask, jsonify, render_template, request
+import pymongo
+from pymongo.errors import PyMongoError
+from models.Mongo.indexes import ensure_indexes, explain_indexed_queries
+from models.Mongo.mongo_models import close_mongo_client
+from models.Mongo.mongo_models import get_pool_stats as get_mongo_pool_stats
+from models.Neo4j.neo4j_models import close_neo4j_driver
+from models.Neo4j.neo4j_models import get_pool_stats as get_neo4j_pool_stats
+from models.Neo4j.schema import find_unindexed_lookups
+from services.routing_service import get_route_cache_stats
+from utils.document_cache import DocumentCache
+from utils.pagination import resolve_total_count
+from utils.persisted_queries import PersistedQueryError, PersistedQueryRegistry
+from utils.query_cost import QueryCostError, analyze_query, check_query_cost
+from utils.reference_cache import reference_cache
+from utils.tracing import DEBUG_HEADER, TracingExtension, get_histograms
 from resolvers.client_resolvers import (
     resolve_client,
     resolve_client_locker,
     resolve_clients,
+    resolve_clients_connection,
+)
+from resolvers.delivery_resolvers import (
+    resolve_delivery_plan,
+    resolve_order_assignments,
+    resolve_trip_estimates,
 )
 from resolvers.island_resolvers import (
     resolve_island,
@@ -26,6 +53,7 @@ from resolvers.locker_resolvers import (
     resolve_locker_port,
     resolve_lockers,
 )
+from resolvers.loaders import Loaders, sibling_middleware
 from resolvers.maintenance_resolvers import (
     resolve_move_seaplane_into_maintenance,
     resolve_move_seaplane_out_of_maintenance,
@@ -42,6 +70,7 @@ from resolvers.order_resolvers import (
     resolve_orders_by_client,
     resolve_orders_by_status,
     resolve_orders_by_warehouse,
+    resolve_orders_connection,
     resolve_update_order_status,
 )
 from resolvers.port_resolvers import (
@@ -52,8 +81,10 @@ from resolvers.port_resolvers import (
     resolve_port_seaplanes,
     resolve_port_warehouse,
     resolve_ports,
+    resolve_ports_connection,
     resolve_shortest_path_between_ports,
 )
+from resolvers.query_planner import planned_middleware
 from resolvers.seaplane_manufacturer_resolvers import (
     resolve_manufacturer,
     resolve_manufacturer_models,
@@ -67,11 +98,13 @@ from resolvers.seaplane_model_resolvers import (
 )
 from resolvers.seaplane_resolvers import (
     resolve_change_seaplane_location,
+    resolve_route_for_seaplane,
     resolve_seaplane,
     resolve_seaplane_model,
     resolve_seaplane_port,
     resolve_seaplane_status,
     resolve_seaplanes,
+    resolve_seaplanes_connection,
 )
 from resolvers.seaplane_status_resolvers import (
     resolve_status,
@@ -103,12 +136,14 @@ query_type.set_field("island", resolve_island)
 
 # Port queries
 query_type.set_field("ports", resolve_ports)
+query_type.set_field("portsConnection", resolve_ports_connection)
 query_type.set_field("port", resolve_port)
 query_type.set_field("nearbyPorts", resolve_nearby_ports)
 query_type.set_field("shortestPathBetweenPorts", resolve_shortest_path_between_ports)
 
 # Client queries
 query_type.set_field("clients", resolve_clients)
+query_type.set_field("clientsConnection", resolve_clients_connection)
 query_type.set_field("client", resolve_client)
 
 # Locker queries
@@ -121,8 +156,10 @@ query_type.set_field("warehouse", resolve_warehouse)
 
 # Seaplane queries
 query_type.set_field("seaplanes", resolve_seaplanes)
+query_type.set_field("seaplanesConnection", resolve_seaplanes_connection)
 query_type.set_field("seaplane", resolve_seaplane)
 query_type.set_field("seaplanesInMaintenance", resolve_seaplanes_in_maintenance)
+query_type.set_field("routeForSeaplane", resolve_route_for_seaplane)
 
 # Seaplane model queries
 query_type.set_field("seaplaneModels", resolve_models)
@@ -138,11 +175,17 @@ query_type.set_field("seaplaneStatus", resolve_status)
 
 # Order queries
 query_type.set_field("orders", resolve_orders)
+query_type.set_field("ordersConnection", resolve_orders_connection)
 query_type.set_field("order", resolve_order)
 query_type.set_field("ordersByClient", resolve_orders_by_client)
 query_type.set_field("ordersByWarehouse", resolve_orders_by_warehouse)
 query_type.set_field("ordersByStatus", resolve_orders_by_status)
 
+# Delivery planning queries
+query_type.set_field("deliveryPlan", resolve_delivery_plan)
+query_type.set_field("orderAssignments", resolve_order_assignments)
+query_type.set_field("tripEstimates", resolve_trip_estimates)
+
 # Scientific Equipment queries
 query_type.set_field("scientificEquipments", resolve_scientific_equipments)
 
@@ -228,6 +271,19 @@ order_type.set_field("client", resolve_order_client)
 order_type.set_field("warehouse", resolve_order_warehouse)
 order_type.set_field("locker", resolve_order_locker)
 
+# Connection types, totalCount is only counted when requested
+connection_types = [
+    ObjectType(name)
+    for name in (
+        "PortConnection",
+        "ClientConnection",
+        "SeaplaneConnection",
+        "OrderConnection",
+    )
+]
+for connection_type in connection_types:
+    connection_type.set_field("totalCount", resolve_total_count)
+
 # ============================================================================
 # Create Executable Schema
 # ============================================================================
@@ -248,6 +304,7 @@ schema = make_executable_schema(
         maintenance_response_type,
         seaplane_location_response_type,
         order_type,
+        *connection_types,
     ],
 )
 
@@ -257,35 +314,191 @@ schema = make_executable_schema(
 app = Flask(__name__, template_folder="template")
 explorer_html = ExplorerGraphiQL().html(None)
 
+# Parsed and validated queries, shared by every request of this worker
+document_cache = DocumentCache(int(os.getenv("GRAPHQL_DOCUMENT_CACHE_SIZE", "256")))
+
+# Automatic persisted queries, registered by hash on first use
+persisted_queries = PersistedQueryRegistry(
+    int(os.getenv("GRAPHQL_PERSISTED_QUERIES_SIZE", "1000"))
+)
+
+# Max age of cacheable GET responses, in seconds
+GET_MAX_AGE = int(os.getenv("GRAPHQL_GET_MAX_AGE", "60"))
+
+# Release pooled database connections when the worker exits
+atexit.register(close_neo4j_driver)
+atexit.register(close_mongo_client)
+
+# Create missing MongoDB indexes, a no-op when they all exist. Bounded so
+# an unreachable server does not hold up startup; `flask migrate` and
+# `flask db-indexes` create them too.
+if os.getenv("MONGO_ENSURE_INDEXES", "true").lower() == "true":
+    try:
+        with pymongo.timeout(int(os.getenv("MONGO_STARTUP_TIMEOUT_MS", "2000")) / 1000):
+            ensure_indexes()
+    except PyMongoError as e:
+        print(f"Could not create MongoDB indexes: {e}")
+
 
 @app.route("/", methods=["GET"])
 def index():
     return render_template("app.html")
 
 
-@app.route("/graphql", methods=["GET"])
-def graphql_explorer():
-    return explorer_html, 200
+def execute_graphql(data, require_query=False):
+    try:
+        data = persisted_queries.resolve(data)
+    except PersistedQueryError as e:
+        error = {"message": str(e), "extensions": {"code": e.code}}
+        status_code = 200 if e.code == "PERSISTED_QUERY_NOT_FOUND" else 400
+        return False, {"errors": [error]}, status_code
+
+    # Estimate the cost of the operation before running any resolver
+    document = None
+    cost = None
+    if isinstance(data, dict) and isinstance(data.get("query"), str):
+        try:
+            document = document_cache.parse(None, data)
+        except GraphQLError:
+            pass
+    if document is not None:
+        cost = analyze_query(
+            schema, document, data.get("operationName"), data.get("variables")
+        )
+    if cost is not None:
+        try:
+            check_query_cost(cost)
+        except QueryCostError as e:
+            error = {"message": str(e), "extensions": {"code": e.code}}
+            return False, {"errors": [error], "extensions": {"cost": cost}}, 400
 
-
-@app.route("/graphql", methods=["POST"])
-def graphql_server():
-    data = request.get_json()
     success, result = graphql_sync(
         schema,
         data,
-        context_value={"request": request},
+        context_value={"request": request, "loaders": Loaders()},
+        middleware=[sibling_middleware, planned_middleware],
+        query_parser=document_cache.parse,
+        query_validator=document_cache.validate,
+        query_document=document,
+        require_query=require_query,
+        extensions=[TracingExtension],
     )
+    if cost is not None:
+        result.setdefault("extensions", {})["cost"] = cost
     status_code = 200 if success else 400
+    return success, result, status_code
+
+
+def get_request_data():
+    data = {"query": request.args.get("query")}
+    if request.args.get("operationName"):
+        data["operationName"] = request.args["operationName"]
+    for name in ("variables", "extensions"):
+        if request.args.get(name):
+            data[name] = json.loads(request.args[name])
+    return data
+
+
+@app.route("/graphql", methods=["GET"])
+def graphql_explorer():
+    if not request.args:
+        return explorer_html, 200
+
+    # Read-only operations over GET, cacheable by browsers and proxies
+    try:
+        data = get_request_data()
+    except ValueError:
+        error = {"message": "variables and extensions must be valid JSON"}
+        return jsonify({"errors": [error]}), 400
+
+    success, result, status_code = execute_graphql(data, require_query=True)
+    response = jsonify(result)
+    response.status_code = status_code
+    # Traced responses differ on every request and must not be shared
+    response.vary.add(DEBUG_HEADER)
+    if request.headers.get(DEBUG_HEADER):
+        response.cache_control.no_store = True
+    elif success:
+        response.cache_control.public = True
+        response.cache_control.max_age = GET_MAX_AGE
+        response.add_etag()
+        response.make_conditional(request)
+    return response
+
+
+@app.route("/graphql", methods=["POST"])
+def graphql_server():
+    _, result, status_code = execute_graphql(request.get_json())
     return jsonify(result), status_code
 
 
+@app.route("/health/pools", methods=["GET"])
+def pool_stats():
+    return (
+        jsonify({"neo4j": get_neo4j_pool_stats(), "mongo": get_mongo_pool_stats()}),
+        200,
+    )
+
+
+@app.route("/health/caches", methods=["GET"])
+def cache_stats():
+    return (
+        jsonify(
+            {
+                "documents": document_cache.stats(),
+                "persisted_queries": persisted_queries.stats(),
+                "reference_data": reference_cache.stats(),
+                "routes": get_route_cache_stats(),
+            }
+        ),
+        200,
+    )
+
+
+@app.route("/health/caches/flush", methods=["POST"])
+def flush_caches():
+    reference_cache.flush()
+    return jsonify({"reference_data": reference_cache.stats()}), 200
+
+
+@app.route("/health/metrics", methods=["GET"])
+def metrics():
+    return jsonify({"latency": get_histograms()}), 200
+
+
 @app.cli.command("migrate")
-def migrate_command():
+@click.option(
+    "--reset", is_flag=True, help="Delete the Neo4j database and migrate again."
+)
+@click.option("--dry-run", is_flag=True, help="Print the plan without migrating.")
+@click.option("--workers", type=int, help="Migrations run concurrently.")
+def migrate_command(reset, dry_run, workers):
     """Run database migrations."""
     print("Running migrations...")
-    migrate()
-    print("Migrations completed successfully!")
+    try:
+        migrate(reset=reset, dry_run=dry_run, max_workers=workers)
+    except MigrationError as e:
+        raise click.ClickException(str(e))
+    if not dry_run:
+        print("Migrations completed successfully!")
+
+
+@app.cli.command("db-indexes")
+def db_indexes_command():
+    """Report Neo4j and MongoDB model queries not backed by an index."""
+    report = find_unindexed_lookups()
+    for function, lookups in report.items():
+        for label, prop, state in lookups:
+            print(f"{function}: {label}.{prop} ({state or 'no index'})")
+    if not report:
+        print("Every Neo4j model lookup is backed by an online index.")
+
+    plans = [plan for plan in explain_indexed_queries() if not plan["indexed"]]
+    for plan in plans:
+        stages = " <- ".join(plan["stages"])
+        print(f"{plan['collection']} {plan['filter']} sort {plan['sort']}: {stages}")
+    if not plans:
+        print("Every MongoDB order and equipment query uses an index.")
 
 
 if __name__ == "__main__":
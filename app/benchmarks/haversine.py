@@ -0,0 +1,82 @@
+"""Compare the scalar and batched haversine implementations.
+
+Run from the app directory: python -m benchmarks.haversine [n] [m]
+"""
+
+import sys
+import timeit
+
+import numpy as np
+
+from utils.harvesine import haversine, haversine_many, haversine_matrix
+
+
+def _points(count, rng):
+    # Around the Galapagos islands
+    return rng.uniform(-1.5, 0.7, count), rng.uniform(-92, -89, count)
+
+
+def _best(fn, repeat=5):
+    number, _ = timeit.Timer(fn).autorange()
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def main(n=200, m=50):
+    rng = np.random.default_rng(0)
+    lats1, lons1 = _points(n, rng)
+    lats2, lons2 = _points(m, rng)
+    lats1_list, lons1_list = lats1.tolist(), lons1.tolist()
+    lats2_list, lons2_list = lats2.tolist(), lons2.tolist()
+    out32 = np.empty((n, m), dtype=np.float32)
+    out64 = np.empty((n, m))
+
+    def scalar_matrix():
+        return [
+            [
+                haversine(lat1, lon1, lat2, lon2)
+                for lat2, lon2 in zip(lats2_list, lons2_list)
+            ]
+            for lat1, lon1 in zip(lats1_list, lons1_list)
+        ]
+
+    def scalar_row():
+        return [
+            haversine(lats1_list[0], lons1_list[0], lat2, lon2)
+            for lat2, lon2 in zip(lats2_list, lons2_list)
+        ]
+
+    cases = [
+        (f"{n}x{m} matrix, scalar loop", scalar_matrix),
+        (
+            f"{n}x{m} matrix, float64",
+            lambda: haversine_matrix(lats1, lons1, lats2, lons2, out=out64),
+        ),
+        (
+            f"{n}x{m} matrix, float32",
+            lambda: haversine_matrix(
+                lats1, lons1, lats2, lons2, dtype=np.float32, out=out32
+            ),
+        ),
+        (f"1x{m} row, scalar loop", scalar_row),
+        (
+            f"1x{m} row, float64",
+            lambda: haversine_many(lats1[0], lons1[0], lats2, lons2),
+        ),
+    ]
+
+    error = np.abs(
+        np.array(scalar_matrix())
+        - haversine_matrix(lats1, lons1, lats2, lons2, dtype=np.float32)
+    ).max()
+
+    baseline = None
+    for name, fn in cases:
+        seconds = _best(fn)
+        if "scalar" in name:
+            baseline = seconds
+        print(f"{name:<32} {seconds * 1e6:>10.1f} us  x{baseline / seconds:.1f}")
+    print(f"max float32 error: {error:.2e} km")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
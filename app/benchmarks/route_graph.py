@@ -0,0 +1,94 @@
+"""Compare Dijkstra over the complete and sparse port graphs.
+
+Run from the app directory: python -m benchmarks.route_graph [ports] [k] [radius_km]
+
+Graphs are built in memory the way create_port_distance_relationships
+builds them in Neo4j, over the Galapagos ports and over random ports.
+"""
+
+import heapq
+import random
+import sys
+import time
+
+import numpy as np
+
+from data.ports import ports_data
+from utils.distance_matrix import PortDistanceMatrix, sparse_edges
+
+
+def _adjacency(distances, pairs):
+    adjacency = [[] for _ in range(len(distances))]
+    for i, j in pairs:
+        distance = float(distances[i, j])
+        adjacency[i].append((j, distance))
+        adjacency[j].append((i, distance))
+    return adjacency
+
+
+def _dijkstra(adjacency, start, end):
+    best = {start: 0.0}
+    queue = [(0.0, start)]
+    while queue:
+        distance, node = heapq.heappop(queue)
+        if node == end:
+            return distance
+        if distance > best[node]:
+            continue
+        for neighbour, weight in adjacency[node]:
+            candidate = distance + weight
+            if candidate < best.get(neighbour, float("inf")):
+                best[neighbour] = candidate
+                heapq.heappush(queue, (candidate, neighbour))
+    return None
+
+
+def _random_ports(count, rng):
+    return [
+        {
+            "name": f"Port {i}",
+            "latitude": rng.uniform(-1.5, 0.7),
+            "longitude": rng.uniform(-92, -89),
+        }
+        for i in range(count)
+    ]
+
+
+def _run(name, ports, k, radius_km, queries=200):
+    distances = PortDistanceMatrix(ports).distances
+    n = len(ports)
+    rng = random.Random(0)
+    routes = [tuple(rng.sample(range(n), 2)) for _ in range(queries)]
+
+    graphs = {
+        "complete": [(i, j) for i in range(n) for j in range(i + 1, n)],
+        f"sparse k={k} r={radius_km:g}": sparse_edges(distances, k, radius_km),
+    }
+    direct = None
+    print(f"{name}: {n} ports")
+    for graph, pairs in graphs.items():
+        adjacency = _adjacency(distances, pairs)
+        start = time.perf_counter()
+        lengths = np.array([_dijkstra(adjacency, a, b) for a, b in routes])
+        latency_ms = (time.perf_counter() - start) * 1000 / queries
+        if direct is None:
+            direct = lengths
+        detour = (lengths / direct).mean()
+        print(
+            f"  {graph:<24} {len(pairs):>8} edges {latency_ms:>9.3f} ms/route"
+            f"  mean length x{detour:.3f}"
+        )
+
+
+def main(count=500, k=5, radius_km=0.0):
+    _run("Galapagos", ports_data, k, radius_km)
+    _run("Random", _random_ports(count, random.Random(0)), k, radius_km)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else 500,
+        int(args[1]) if len(args) > 1 else 5,
+        float(args[2]) if len(args) > 2 else 0.0,
+    )
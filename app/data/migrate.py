@@ -1,4 +1,10 @@
 # Neo4j migration
+import hashlib
+import json
+import os
+import time
+from functools import partial
+
 from data.clients import scientists_data
 from data.islands import islands_data
 from data.lockers import lockers_data
@@ -8,30 +14,235 @@ from data.seaplanes.models import seaplanes_models_data
 from data.seaplanes.seaplanes import seaplanes_data
 from data.seaplanes.status import seaplanes_status_data
 from data.warehouse import warehouse_data
-from models.Neo4j.clients import insert_clients
-from models.Neo4j.islands import insert_islands
-from models.Neo4j.lockers import insert_lockers
+from models.Neo4j.clients import upsert_clients
+from models.Neo4j.islands import upsert_islands
+from models.Neo4j.lockers import upsert_lockers
+from models.Neo4j.migrations import get_applied_migrations, record_migration
 from models.Neo4j.neo4j_models import clean_database
-from models.Neo4j.ports import create_port_distance_relationships, insert_ports
-from models.Neo4j.seaplanes import insert_seaplanes
-from models.Neo4j.seaplanes_manufacturer import insert_seaplanes_manufacturers
-from models.Neo4j.seaplanes_models import insert_seaplanes_models
-from models.Neo4j.seaplanes_status import insert_seaplanes_status
-from models.Neo4j.warehouse import insert_warehouse
-from models.Mongo.scientific_equipment import insert_scientific_equipment
+from models.Neo4j.schema import SCHEMA, create_schema
+from models.Neo4j.ports import (
+    create_port_distance_relationships,
+    deduplicate_port_distances,
+    route_graph_settings,
+    upsert_ports,
+)
+from models.Neo4j.seaplanes import upsert_seaplanes
+from models.Neo4j.seaplanes_manufacturer import upsert_seaplanes_manufacturers
+from models.Neo4j.seaplanes_models import upsert_seaplanes_models
+from models.Neo4j.seaplanes_status import upsert_seaplanes_status
+from models.Neo4j.warehouse import upsert_warehouse
+from models.Mongo.indexes import INDEXES, ensure_indexes
+from models.Mongo.scientific_equipment import upsert_scientific_equipment
 from data.scientific_equipment import equipment_data
+from utils.task_graph import run_task_graph, topological_waves
+
+
+def _link_ports(ports, settings):
+    # ports only makes the links follow changes of the port dataset
+    create_port_distance_relationships(settings=settings)
+
+
+class MigrationError(Exception):
+    def __init__(self, message, outcomes):
+        super().__init__(message)
+        self.outcomes = outcomes
+
+
+# inputs() returns the arguments of step. A migration runs again when its
+# arguments change, so steps must be idempotent; versions are recorded in
+# the graph and never reused. A migration starts once the migrations it
+# requires are complete, independent ones run concurrently.
+MIGRATIONS = [
+    {
+        "version": 1,
+        "name": "constraints and indexes",
+        "step": create_schema,
+        "inputs": lambda: [SCHEMA],
+        "requires": [],
+    },
+    {
+        "version": 2,
+        "name": "mongo indexes",
+        "step": ensure_indexes,
+        "inputs": lambda: [INDEXES],
+        "requires": [],
+    },
+    {
+        "version": 3,
+        "name": "islands",
+        "step": upsert_islands,
+        "inputs": lambda: [islands_data],
+        "requires": ["constraints and indexes"],
+    },
+    {
+        "version": 4,
+        "name": "ports",
+        "step": upsert_ports,
+        "inputs": lambda: [ports_data],
+        "requires": ["islands"],
+    },
+    {
+        "version": 5,
+        "name": "manufacturers",
+        "step": upsert_seaplanes_manufacturers,
+        "inputs": lambda: [seaplanes_manufacturer_data],
+        "requires": ["constraints and indexes"],
+    },
+    {
+        "version": 6,
+        "name": "seaplane models",
+        "step": upsert_seaplanes_models,
+        "inputs": lambda: [seaplanes_models_data],
+        "requires": ["manufacturers"],
+    },
+    {
+        "version": 7,
+        "name": "seaplane statuses",
+        "step": upsert_seaplanes_status,
+        "inputs": lambda: [seaplanes_status_data],
+        "requires": ["constraints and indexes"],
+    },
+    {
+        "version": 8,
+        "name": "seaplanes",
+        "step": upsert_seaplanes,
+        "inputs": lambda: [seaplanes_data],
+        "requires": ["ports", "seaplane models", "seaplane statuses"],
+    },
+    {
+        "version": 9,
+        "name": "lockers",
+        "step": upsert_lockers,
+        "inputs": lambda: [lockers_data],
+        "requires": ["ports"],
+    },
+    {
+        "version": 10,
+        "name": "warehouses",
+        "step": upsert_warehouse,
+        "inputs": lambda: [warehouse_data],
+        "requires": ["ports"],
+    },
+    {
+        "version": 11,
+        "name": "clients",
+        "step": upsert_clients,
+        "inputs": lambda: [scientists_data],
+        "requires": ["lockers"],
+    },
+    {
+        "version": 12,
+        "name": "scientific equipment",
+        "step": upsert_scientific_equipment,
+        "inputs": lambda: [equipment_data],
+        "requires": ["mongo indexes"],
+    },
+    {
+        "version": 13,
+        "name": "port distances",
+        "step": _link_ports,
+        "inputs": lambda: [ports_data, route_graph_settings()],
+        "requires": ["ports", "port distance duplicates"],
+    },
+    {
+        "version": 14,
+        "name": "port distance duplicates",
+        "step": deduplicate_port_distances,
+        "inputs": lambda: [],
+        "requires": ["ports"],
+    },
+]
+
+
+def _workers():
+    return int(os.getenv("MIGRATION_WORKERS", "4"))
+
+
+def _checksum(args):
+    # Index models are compared on their specification
+    encoded = json.dumps(
+        args,
+        sort_keys=True,
+        default=lambda value: getattr(value, "document", str(value)),
+    )
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _plan(applied):
+    plan = {}
+    for migration in MIGRATIONS:
+        args = migration["inputs"]()
+        checksum = _checksum(args)
+        recorded = applied.get(migration["version"], {}).get("checksum")
+        plan[migration["name"]] = {
+            **migration,
+            "args": args,
+            "checksum": checksum,
+            "pending": recorded != checksum,
+        }
+    return plan
+
+
+def _apply(migration):
+    if not migration["pending"]:
+        return False
+    started = time.perf_counter()
+    migration["step"](*migration["args"])
+    duration_ms = round((time.perf_counter() - started) * 1000)
+    record_migration(
+        migration["version"], migration["name"], migration["checksum"], duration_ms
+    )
+    return True
+
+
+def _print_outcome(migration, outcome):
+    label = f"{migration['version']} {migration['name']}"
+    if outcome["status"] != "done":
+        print(f"{label}: {outcome['status']} ({outcome['error']})")
+    elif outcome["result"]:
+        print(f"{label}: {outcome['seconds']:.2f}s")
+    else:
+        print(f"{label}: up to date")
+
+
+def migrate(reset=False, dry_run=False, max_workers=None):
+    """Apply the migrations that are new or whose inputs changed.
+
+    Migrations run on a pool of max_workers threads (MIGRATION_WORKERS by
+    default) as soon as those they require are complete. A failed migration
+    does not stop the others, only those requiring it; MigrationError is
+    raised once everything else ran. With reset, the Neo4j database is
+    deleted first, in batches, and every migration runs again. With
+    dry_run, the plan is printed and nothing is written.
+
+    Returns the outcome of each migration (see run_task_graph).
+    """
+    applied = {} if reset else get_applied_migrations()
+    plan = _plan(applied)
+    dependencies = {name: migration["requires"] for name, migration in plan.items()}
+
+    if dry_run:
+        for number, wave in enumerate(topological_waves(dependencies), 1):
+            print(f"Wave {number}:")
+            for name in wave:
+                migration = plan[name]
+                state = "pending" if migration["pending"] else "up to date"
+                requires = ", ".join(migration["requires"]) or "nothing"
+                print(f"  {migration['version']} {name}: {state}, after {requires}")
+        return {}
 
+    if reset:
+        clean_database()
+    started = time.perf_counter()
+    outcomes = run_task_graph(
+        {name: partial(_apply, migration) for name, migration in plan.items()},
+        dependencies,
+        max_workers=max_workers or _workers(),
+        on_complete=lambda name, outcome: _print_outcome(plan[name], outcome),
+    )
+    print(f"Total: {time.perf_counter() - started:.2f}s")
 
-def migrate():
-    clean_database()
-    insert_islands(islands_data)
-    insert_ports(ports_data)
-    insert_seaplanes_manufacturers(seaplanes_manufacturer_data)
-    insert_seaplanes_models(seaplanes_models_data)
-    insert_seaplanes_status(seaplanes_status_data)
-    insert_seaplanes(seaplanes_data)
-    insert_lockers(lockers_data)
-    insert_warehouse(warehouse_data)
-    insert_clients(scientists_data)
-    insert_scientific_equipment(equipment_data)
-    create_port_distance_relationships()
+    failed = [name for name, outcome in outcomes.items() if outcome["status"] != "done"]
+    if failed:
+        raise MigrationError(f"Migrations not applied: {', '.join(failed)}", outcomes)
+    return outcomes
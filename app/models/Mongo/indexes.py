@@ -0,0 +1,84 @@
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from models.Mongo.mongo_models import get_mongo_db
+
+# Orders are listed newest first, with _id breaking ties between orders
+# created at the same time (see get_orders_page)
+_NEWEST_FIRST = [("created_at", DESCENDING), ("_id", DESCENDING)]
+
+INDEXES = {
+    "orders": [
+        IndexModel(_NEWEST_FIRST, name="created_at_id"),
+        IndexModel([("client_id", ASCENDING), *_NEWEST_FIRST], name="client_id"),
+        IndexModel([("warehouse_id", ASCENDING), *_NEWEST_FIRST], name="warehouse_id"),
+        IndexModel([("status", ASCENDING), *_NEWEST_FIRST], name="status"),
+    ],
+    "equipment": [
+        IndexModel([("id", ASCENDING)], name="id"),
+        IndexModel([("name", ASCENDING)], name="name"),
+    ],
+}
+
+# (collection, filter, sort) of the queries INDEXES must serve without a
+# collection scan or an in-memory sort
+INDEXED_QUERIES = [
+    ("orders", {}, [("created_at", DESCENDING)]),
+    ("orders", {}, _NEWEST_FIRST),
+    ("orders", {"client_id": 0}, [("created_at", DESCENDING)]),
+    ("orders", {"client_id": 0}, _NEWEST_FIRST),
+    ("orders", {"warehouse_id": 0}, [("created_at", DESCENDING)]),
+    ("orders", {"warehouse_id": 0}, _NEWEST_FIRST),
+    ("orders", {"status": "pending"}, [("created_at", DESCENDING)]),
+    ("orders", {"status": "pending"}, _NEWEST_FIRST),
+    ("equipment", {"id": 0}, None),
+    ("equipment", {"name": ""}, None),
+]
+
+
+def ensure_indexes(indexes=None):
+    """Create the indexes of INDEXES; existing ones are left untouched.
+
+    Returns the names of the indexes of each collection.
+    """
+    db = get_mongo_db()
+    return {
+        collection: db[collection].create_indexes(models)
+        for collection, models in (indexes or INDEXES).items()
+    }
+
+
+def _stages(plan):
+    # Newer servers wrap the classic plan tree in a queryPlan document
+    plan = plan.get("queryPlan", plan)
+    stages = [plan["stage"]]
+    for child in [plan.get("inputStage"), *plan.get("inputStages", [])]:
+        if child:
+            stages.extend(_stages(child))
+    return stages
+
+
+def explain_indexed_queries():
+    """Explain each query of INDEXED_QUERIES and tell whether it is indexed.
+
+    A query is indexed when its winning plan uses an IXSCAN and has neither
+    a COLLSCAN nor a blocking SORT stage.
+    """
+    db = get_mongo_db("read")
+    plans = []
+    for collection, query, sort in INDEXED_QUERIES:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        stages = _stages(cursor.explain()["queryPlanner"]["winningPlan"])
+        plans.append(
+            {
+                "collection": collection,
+                "filter": query,
+                "sort": sort,
+                "stages": stages,
+                "indexed": "IXSCAN" in stages
+                and "COLLSCAN" not in stages
+                and "SORT" not in stages,
+            }
+        )
+    return plans
@@ -1,11 +1,159 @@
 import os
+import threading
+import time
 
-from pymongo import MongoClient
+from pymongo import MongoClient, ReadPreference, monitoring
+from pymongo.write_concern import WriteConcern
+from utils.tracing import record_db_call
 
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
 
-def get_mongo_db():
-    client = MongoClient(os.getenv("MONGO_URI"))
-    return client.get_database(name="galapagos")
+_READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+# Read preference used for each kind of operation, overridable with
+# MONGO_READ_PREFERENCE_<KIND> (e.g. MONGO_READ_PREFERENCE_ANALYTICS=secondary)
+_DEFAULT_READ_PREFERENCES = {
+    "write": "primary",
+    "read": "primaryPreferred",
+    "analytics": "secondaryPreferred",
+}
+
+
+class _CommandTracer(monitoring.CommandListener):
+    # Listeners run on the thread issuing the command, so calls are
+    # attributed to the resolver running on that thread.
+    def __init__(self):
+        self._started = {}
+
+    def _key(self, event):
+        return (event.connection_id, event.request_id)
+
+    def started(self, event):
+        command = {
+            key: value
+            for key, value in event.command.items()
+            if key not in ("lsid", "$db", "$clusterTime", "$readPreference")
+        }
+        self._started[self._key(event)] = (time.perf_counter(), command)
+
+    def succeeded(self, event):
+        start, command = self._started.pop(self._key(event), (None, {}))
+        if start is None:
+            return
+        reply = event.reply
+        cursor = reply.get("cursor", {})
+        rows = reply.get(
+            "n", len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+        )
+        record_db_call(
+            "mongo",
+            f"{event.command_name} {command.get(event.command_name)}",
+            command,
+            rows,
+            start,
+            event.duration_micros / 1000,
+        )
+
+    def failed(self, event):
+        self._started.pop(self._key(event), None)
+
+
+def _pool_settings():
+    return {
+        "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+        "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+        "waitQueueTimeoutMS": int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "30000")),
+    }
+
+
+def _write_concern():
+    w = os.getenv("MONGO_WRITE_CONCERN", "1")
+    journal = os.getenv("MONGO_WRITE_JOURNAL")
+    return WriteConcern(
+        w=int(w) if w.isdigit() else w,
+        j=journal.lower() == "true" if journal else None,
+    )
+
+
+def _read_preference(kind):
+    name = os.getenv(
+        "MONGO_READ_PREFERENCE_" + kind.upper(), _DEFAULT_READ_PREFERENCES[kind]
+    )
+    if name not in _READ_PREFERENCES:
+        raise Exception(f"Invalid read preference '{name}' for '{kind}' operations")
+    return _READ_PREFERENCES[name]
+
+
+def _reset_after_fork():
+    # MongoClient is not fork-safe: the child must open its own pool.
+    global _client, _client_pid
+    _client = None
+    _client_pid = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_mongo_client():
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _client_lock:
+        if _client is not None and _client_pid == pid:
+            return _client
+
+        _client = MongoClient(
+            os.getenv("MONGO_URI"),
+            event_listeners=[_CommandTracer()],
+            **_pool_settings(),
+        )
+        _client_pid = pid
+        return _client
+
+
+def get_mongo_db(kind="write"):
+    """Return the MONGO_DATABASE database configured for a kind of operation.
+
+    kind is one of "write", "read" or "analytics" and selects the read
+    preference; every kind uses the configured write concern.
+    """
+    if kind not in _DEFAULT_READ_PREFERENCES:
+        raise Exception(f"Unknown operation kind '{kind}'")
+    return get_mongo_client().get_database(
+        name=os.getenv("MONGO_DATABASE", "galapagos"),
+        read_preference=_read_preference(kind),
+        write_concern=_write_concern(),
+    )
+
+
+def close_mongo_client():
+    global _client, _client_pid
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+def get_pool_stats():
+    stats = {"initialized": _client is not None, "pid": _client_pid}
+    stats.update(_pool_settings())
+    stats["write_concern"] = _write_concern().document
+    stats["read_preferences"] = {
+        kind: _read_preference(kind).mongos_mode for kind in _DEFAULT_READ_PREFERENCES
+    }
+    return stats
 
 
 def insert_seaplanes(seaplanes):
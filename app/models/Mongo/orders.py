@@ -26,7 +26,7 @@ def create_order(client_id, warehouse_id, locker_id, crate_quantity):
 
 
 def get_all_orders():
-    db = get_mongo_db()
+    db = get_mongo_db("read")
     orders = list(db.orders.find().sort("created_at", -1))
 
     # Convert ObjectId to string
@@ -37,8 +37,47 @@ def get_all_orders():
     return orders
 
 
+def _orders_filter(client_id=None, warehouse_id=None, status=None):
+    query = {}
+    if client_id is not None:
+        query["client_id"] = client_id
+    if warehouse_id is not None:
+        query["warehouse_id"] = warehouse_id
+    if status is not None:
+        query["status"] = status
+    return query
+
+
+def get_orders_page(first, after=None, client_id=None, warehouse_id=None, status=None):
+    db = get_mongo_db("read")
+    query = _orders_filter(client_id, warehouse_id, status)
+
+    # Keyset pagination on (created_at, _id), both descending
+    if after is not None:
+        created_at, order_id = after
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": ObjectId(order_id)}},
+        ]
+
+    orders = list(
+        db.orders.find(query).sort([("created_at", -1), ("_id", -1)]).limit(first + 1)
+    )
+
+    for order in orders:
+        order["_id"] = str(order["_id"])
+        order["id"] = order["_id"]
+
+    return orders
+
+
+def count_orders(client_id=None, warehouse_id=None, status=None):
+    db = get_mongo_db("read")
+    return db.orders.count_documents(_orders_filter(client_id, warehouse_id, status))
+
+
 def get_order_by_id(order_id):
-    db = get_mongo_db()
+    db = get_mongo_db("read")
 
     try:
         order = db.orders.find_one({"_id": ObjectId(order_id)})
@@ -51,7 +90,7 @@ def get_order_by_id(order_id):
 
 
 def get_orders_by_client(client_id):
-    db = get_mongo_db()
+    db = get_mongo_db("read")
     orders = list(db.orders.find({"client_id": client_id}).sort("created_at", -1))
 
     for order in orders:
@@ -62,7 +101,7 @@ def get_orders_by_client(client_id):
 
 
 def get_orders_by_warehouse(warehouse_id):
-    db = get_mongo_db()
+    db = get_mongo_db("read")
     orders = list(db.orders.find({"warehouse_id": warehouse_id}).sort("created_at", -1))
 
     for order in orders:
@@ -73,7 +112,7 @@ def get_orders_by_warehouse(warehouse_id):
 
 
 def get_orders_by_status(status):
-    db = get_mongo_db()
+    db = get_mongo_db("read")
     orders = list(db.orders.find({"status": status}).sort("created_at", -1))
 
     for order in orders:
@@ -151,7 +190,7 @@ def delete_order(order_id):
 
 
 def get_order_statistics():
-    db = get_mongo_db()
+    db = get_mongo_db("analytics")
 
     pipeline = [
         {
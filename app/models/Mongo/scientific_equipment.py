@@ -1,4 +1,6 @@
 from models.Mongo.mongo_models import get_mongo_db
+from pymongo import UpdateOne
+
 
 def insert_scientific_equipment(equipment_list):
     db = get_mongo_db()
@@ -9,9 +11,26 @@ def insert_scientific_equipment(equipment_list):
     db.equipment.insert_many(equipment_list)
 
 
-def get_all_equipment():
+def upsert_scientific_equipment(equipment_list):
     db = get_mongo_db()
 
+    if not equipment_list:
+        return 0
+
+    # Unchanged documents match without being modified
+    result = db.equipment.bulk_write(
+        [
+            UpdateOne({"id": equipment["id"]}, {"$set": equipment}, upsert=True)
+            for equipment in equipment_list
+        ],
+        ordered=False,
+    )
+    return result.upserted_count + result.modified_count
+
+
+def get_all_equipment():
+    db = get_mongo_db("read")
+
     equipments = list(db.equipment.find())
 
     return equipments
@@ -1,27 +1,31 @@
-from .neo4j_models import get_neo4j_driver
+from utils.reference_cache import invalidate
 
+from .neo4j_models import get_changed_rows, get_neo4j_driver, write_in_batches
 
-def insert_clients(clients_data):
-    driver = get_neo4j_driver()
-    with driver.session() as session:
-        for client in clients_data:
-            query = """
-                MATCH (l:Locker)-[:LOCATED_AT]->(p:Port {name: $locker_port})
-                CREATE (c:Client {
-                    name: $name,
-                    specialty: $specialty,
-                    id: $id
-                })
-                CREATE (c)-[:ASSIGNED_TO]->(l)
-                RETURN c
-            """
-            session.run(
-                query,
-                name=client["name"],
-                specialty=client["specialty"],
-                id=client["id"],
-                locker_port=client["locker"],
-            )
+
+def upsert_clients(clients_data, batch_size=None):
+    rows = get_changed_rows(
+        "Client",
+        "id",
+        clients_data,
+        ("name", "specialty"),
+        {"locker": ("-[:ASSIGNED_TO]->(:Locker)-[:LOCATED_AT]->", "Port", "name")},
+    )
+    query = """
+        UNWIND $rows AS row
+        MATCH (l:Locker)-[:LOCATED_AT]->(p:Port {name: row.locker})
+        MERGE (c:Client {id: row.id})
+        SET c.name = row.name, c.specialty = row.specialty
+        WITH c, l
+        OPTIONAL MATCH (c)-[old:ASSIGNED_TO]->(other:Locker) WHERE other <> l
+        DELETE old
+        WITH DISTINCT c, l
+        MERGE (c)-[:ASSIGNED_TO]->(l)
+    """
+    write_in_batches(query, rows, batch_size=batch_size)
+    if rows:
+        invalidate("clients")
+    return len(rows)
 
 
 def get_all_clients():
@@ -32,6 +36,31 @@ def get_all_clients():
         return [dict(record["c"]) for record in result]
 
 
+def get_clients_page(first, after_name=None, after_id=None):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            MATCH (c:Client)
+            WHERE $after_name IS NULL
+                OR c.name > $after_name
+                OR (c.name = $after_name AND c.id > $after_id)
+            RETURN c
+            ORDER BY c.name, c.id
+            LIMIT $limit
+        """
+        result = session.run(
+            query, after_name=after_name, after_id=after_id, limit=first + 1
+        )
+        return [dict(record["c"]) for record in result]
+
+
+def count_clients():
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = "MATCH (c:Client) RETURN count(c) AS total"
+        return session.run(query).single()["total"]
+
+
 def get_client_by_name(name):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -56,3 +85,30 @@ def get_clients_by_locker(locker_id):
         query = "MATCH (c:Client)-[:ASSIGNED_TO]->(l:Locker {id: $locker_id}) RETURN c"
         result = session.run(query, locker_id=locker_id)
         return [dict(record["c"]) for record in result]
+
+
+def get_clients_by_ids(ids):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            UNWIND $ids AS id
+            MATCH (c:Client {id: id})
+            RETURN id, c
+        """
+        result = session.run(query, ids=ids)
+        return {record["id"]: dict(record["c"]) for record in result}
+
+
+def get_clients_by_lockers(locker_ids):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            UNWIND $locker_ids AS locker_id
+            MATCH (c:Client)-[:ASSIGNED_TO]->(l:Locker {id: locker_id})
+            RETURN locker_id, collect(c) AS clients
+        """
+        result = session.run(query, locker_ids=locker_ids)
+        return {
+            record["locker_id"]: [dict(node) for node in record["clients"]]
+            for record in result
+        }
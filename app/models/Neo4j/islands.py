@@ -1,14 +1,21 @@
-from .neo4j_models import get_neo4j_driver
+from utils.reference_cache import cached, cached_batch, invalidate
 
+from .neo4j_models import get_changed_rows, get_neo4j_driver, write_in_batches
 
-def insert_islands(islands_data):
-    driver = get_neo4j_driver()
-    with driver.session() as session:
-        for island in islands_data:
-            query = "CREATE (i:Island {name: $name})"
-            session.run(query, name=island["name"])
 
+def upsert_islands(islands_data, batch_size=None):
+    rows = get_changed_rows("Island", "name", islands_data)
+    query = """
+        UNWIND $rows AS row
+        MERGE (i:Island {name: row.name})
+    """
+    write_in_batches(query, rows, batch_size=batch_size)
+    if rows:
+        invalidate("islands")
+    return len(rows)
 
+
+@cached("islands")
 def get_islands():
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -17,6 +24,7 @@ def get_islands():
         return [dict(record["i"]) for record in result]
 
 
+@cached("islands")
 def get_island(name):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -26,6 +34,7 @@ def get_island(name):
         return dict(record["i"]) if record else None
 
 
+@cached("islands", "ports")
 def get_island_by_port(name):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -33,3 +42,16 @@ def get_island_by_port(name):
         result = session.run(query, name=name)
         record = result.single()
         return dict(record["i"]) if record else None
+
+
+@cached_batch("islands", "ports")
+def get_islands_by_ports(names):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            UNWIND $names AS name
+            MATCH (i:Island)<-[:LOCATED_ON]-(p:Port {name: name})
+            RETURN name, i
+        """
+        result = session.run(query, names=names)
+        return {record["name"]: dict(record["i"]) for record in result}
@@ -1,30 +1,36 @@
-from .neo4j_models import get_neo4j_driver
+from utils.reference_cache import cached, cached_batch, invalidate
 
+from .neo4j_models import get_changed_rows, get_neo4j_driver, write_in_batches
 
-def insert_lockers(locker_data):
-    driver = get_neo4j_driver()
-    with driver.session() as session:
-        for locker in locker_data:
-            query = """
-                MATCH (p:Port {name: $port_name})
-                CREATE (l:Locker {
-                    capacity: $capacity,
-                    remaining_capacity: $remaining_capacity,
-                    id: $id
-                })
-                CREATE (l)-[:LOCATED_AT]->(p)
-                RETURN l
-            """
-
-            session.run(
-                query,
-                port_name=locker["port_name"],
-                capacity=locker["capacity"],
-                id=locker["id"],
-                remaining_capacity=locker["remaining_capacity"],
-            )
+
+def upsert_lockers(locker_data, batch_size=None):
+    # The remaining capacity is live data, only set on new lockers
+    rows = get_changed_rows(
+        "Locker",
+        "id",
+        locker_data,
+        ("capacity",),
+        {"port_name": ("-[:LOCATED_AT]->", "Port", "name")},
+    )
+    query = """
+        UNWIND $rows AS row
+        MATCH (p:Port {name: row.port_name})
+        MERGE (l:Locker {id: row.id})
+        ON CREATE SET l.remaining_capacity = row.remaining_capacity
+        SET l.capacity = row.capacity
+        WITH l, p
+        OPTIONAL MATCH (l)-[old:LOCATED_AT]->(other:Port) WHERE other <> p
+        DELETE old
+        WITH DISTINCT l, p
+        MERGE (l)-[:LOCATED_AT]->(p)
+    """
+    write_in_batches(query, rows, batch_size=batch_size)
+    if rows:
+        invalidate("lockers")
+    return len(rows)
 
 
+@cached("lockers")
 def get_all_lockers():
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -33,6 +39,7 @@ def get_all_lockers():
         return [dict(record["l"]) for record in result]
 
 
+@cached("lockers")
 def get_locker_by_port(port_name):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -42,6 +49,7 @@ def get_locker_by_port(port_name):
         return dict(record["l"]) if record else None
 
 
+@cached("lockers")
 def get_locker(id):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -51,6 +59,7 @@ def get_locker(id):
         return dict(record["l"]) if record else None
 
 
+@cached("lockers", "clients")
 def get_locker_for_client(client_name):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -76,9 +85,11 @@ def update_locker_capacity(port_name, new_remaining_capacity):
             new_remaining_capacity=new_remaining_capacity,
         )
         record = result.single()
-        return dict(record["l"]) if record else None
+    invalidate("lockers")
+    return dict(record["l"]) if record else None
 
 
+@cached("lockers", "ports")
 def get_lockers_with_available_capacity(min_capacity=1):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -95,3 +106,42 @@ def get_lockers_with_available_capacity(min_capacity=1):
             locker_data["port"] = dict(record["p"])
             lockers.append(locker_data)
         return lockers
+
+
+@cached_batch("lockers")
+def get_lockers(ids):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            UNWIND $ids AS id
+            MATCH (l:Locker {id: id})
+            RETURN id, l
+        """
+        result = session.run(query, ids=ids)
+        return {record["id"]: dict(record["l"]) for record in result}
+
+
+@cached_batch("lockers")
+def get_lockers_by_ports(port_names):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            UNWIND $port_names AS port_name
+            MATCH (l:Locker)-[:LOCATED_AT]->(p:Port {name: port_name})
+            RETURN port_name, l
+        """
+        result = session.run(query, port_names=port_names)
+        return {record["port_name"]: dict(record["l"]) for record in result}
+
+
+@cached_batch("lockers", "clients")
+def get_lockers_for_clients(client_names):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            UNWIND $client_names AS client_name
+            MATCH (c:Client {name: client_name})-[:ASSIGNED_TO]->(l:Locker)
+            RETURN client_name, l
+        """
+        result = session.run(query, client_names=client_names)
+        return {record["client_name"]: dict(record["l"]) for record in result}
@@ -0,0 +1,29 @@
+from .neo4j_models import get_neo4j_driver
+
+
+def get_applied_migrations():
+    """Map the version of each applied migration to its record."""
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = "MATCH (m:Migration) RETURN m"
+        result = session.run(query)
+        return {record["m"]["version"]: dict(record["m"]) for record in result}
+
+
+def record_migration(version, name, checksum, duration_ms):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            MERGE (m:Migration {version: $version})
+            SET m.name = $name,
+                m.checksum = $checksum,
+                m.duration_ms = $duration_ms,
+                m.applied_at = datetime()
+        """
+        session.run(
+            query,
+            version=version,
+            name=name,
+            checksum=checksum,
+            duration_ms=duration_ms,
+        )
@@ -1,23 +1,272 @@
+import itertools
 import os
+import threading
+import time
 
 from neo4j import GraphDatabase
+from utils.reference_cache import reference_cache
+from utils.tracing import record_db_call
+
+_driver = None
+_driver_pid = None
+_driver_lock = threading.Lock()
+
+
+def _pool_settings():
+    return {
+        "max_connection_pool_size": int(os.getenv("NEO4J_MAX_POOL_SIZE", "50")),
+        "connection_acquisition_timeout": float(
+            os.getenv("NEO4J_ACQUISITION_TIMEOUT", "30")
+        ),
+        "max_connection_lifetime": float(
+            os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600")
+        ),
+    }
+
+
+def _reset_after_fork():
+    # The child inherits the parent's sockets: drop the reference without
+    # closing so the parent's connections are left untouched.
+    global _driver, _driver_pid
+    _driver = None
+    _driver_pid = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class _Records(list):
+    def single(self):
+        return self[0] if self else None
+
+
+class _TracedSession:
+    # Fetches results eagerly so each call is timed including its records
+    def __init__(self, session):
+        self._session = session
+
+    def __enter__(self):
+        self._session.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._session.__exit__(*exc_info)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def run(self, query, parameters=None, **kwargs):
+        return _run_traced(self._session, query, parameters, kwargs)
+
+    def begin_transaction(self, **config):
+        return _TracedTransaction(self._session.begin_transaction(**config))
+
+    def execute_write(self, work, *args, **kwargs):
+        return self._session.execute_write(
+            lambda tx: work(_TracedTransaction(tx), *args, **kwargs)
+        )
+
+
+class _TracedTransaction:
+    def __init__(self, transaction):
+        self._transaction = transaction
+
+    def __enter__(self):
+        self._transaction.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._transaction.__exit__(*exc_info)
+
+    def __getattr__(self, name):
+        return getattr(self._transaction, name)
+
+    def run(self, query, parameters=None, **kwargs):
+        return _run_traced(self._transaction, query, parameters, kwargs)
+
+
+def _run_traced(runner, query, parameters, kwargs):
+    start = time.perf_counter()
+    records = _Records(runner.run(query, parameters, **kwargs))
+    duration_ms = (time.perf_counter() - start) * 1000
+    params = {**(parameters or {}), **kwargs}
+    record_db_call("neo4j", query, params, len(records), start, duration_ms)
+    return records
+
+
+class _TracedDriver:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def session(self, **config):
+        return _TracedSession(self._driver.session(**config))
 
 
 def get_neo4j_driver():
-    uri = os.getenv("NEO4J_URI")
-    user = os.getenv("NEO4J_USER")
-    password = os.getenv("NEO4J_PASSWORD")
-    if uri and user and password:
-        return GraphDatabase.driver(uri, auth=(user, password))
-    raise Exception("Invalid values")
+    global _driver, _driver_pid
+    pid = os.getpid()
+    if _driver is not None and _driver_pid == pid:
+        return _driver
 
+    with _driver_lock:
+        if _driver is not None and _driver_pid == pid:
+            return _driver
 
-def clean_database():
+        uri = os.getenv("NEO4J_URI")
+        user = os.getenv("NEO4J_USER")
+        password = os.getenv("NEO4J_PASSWORD")
+        if not (uri and user and password):
+            raise Exception("Invalid values")
+
+        _driver = _TracedDriver(
+            GraphDatabase.driver(uri, auth=(user, password), **_pool_settings())
+        )
+        _driver_pid = pid
+        return _driver
+
+
+def close_neo4j_driver():
+    global _driver, _driver_pid
+    with _driver_lock:
+        if _driver is not None and _driver_pid == os.getpid():
+            _driver.close()
+        _driver = None
+        _driver_pid = None
+
+
+def get_pool_stats():
+    stats = {"initialized": _driver is not None, "pid": _driver_pid}
+    stats.update(_pool_settings())
+    if _driver is None:
+        return stats
+
+    # The driver does not expose pool metrics publicly, read them off the pool.
+    pool = getattr(_driver._driver, "_pool", None)
+    connections = getattr(pool, "connections", {}) or {}
+    addresses = []
+    for address, conns in list(connections.items()):
+        conns = list(conns)
+        in_use = sum(1 for conn in conns if getattr(conn, "in_use", False))
+        addresses.append(
+            {
+                "address": str(address),
+                "in_use": in_use,
+                "idle": len(conns) - in_use,
+            }
+        )
+    stats["addresses"] = addresses
+    stats["in_use"] = sum(a["in_use"] for a in addresses)
+    stats["idle"] = sum(a["idle"] for a in addresses)
+    return stats
+
+
+def write_batch_size():
+    return int(os.getenv("NEO4J_WRITE_BATCH_SIZE", "1000"))
+
+
+def _run_write(tx, query, **params):
+    return tx.run(query, **params).single()
+
+
+def write_in_batches(query, rows, total=None, batch_size=None, progress=None):
+    """Run an UNWIND $rows write query over rows, one transaction per batch.
+
+    Batches are retried on transient errors such as deadlocks, which
+    concurrent writers to the same nodes run into.
+
+    rows may be a generator, total is then the number of rows it yields.
+    progress is called with (written, total) after each committed batch.
+    Returns the number of rows written.
+    """
+    batch_size = batch_size or write_batch_size()
+    if total is None and hasattr(rows, "__len__"):
+        total = len(rows)
+
+    written = 0
+    rows = iter(rows)
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                break
+            session.execute_write(_run_write, query, rows=batch)
+            written += len(batch)
+            if progress is not None:
+                progress(written, total)
+    return written
+
+
+def get_changed_rows(label, key, rows, properties=(), relations=None):
+    """Return the rows without a matching node or whose node differs.
+
+    Nodes are matched on row[key] and compared on properties, which rows
+    and nodes name the same way. relations maps row fields to the node
+    they link to, as (pattern from the node, related label, related key):
+    a node differs unless it links to exactly the node row[field] names.
+    """
+    relations = relations or {}
+    fields = [f".{prop}" for prop in properties] + [
+        f"{field}: [(n){pattern}(r:{related}) | r.{related_key}]"
+        for field, (pattern, related, related_key) in relations.items()
+    ]
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = (
+            f"MATCH (n:{label}) "
+            f"RETURN n.{key} AS key, n {{{', '.join(fields)}}} AS node"
+        )
+        result = session.run(query)
+        nodes = {record["key"]: record["node"] for record in result}
+    return [
+        row
+        for row in rows
+        if row[key] not in nodes
+        or nodes[row[key]]
+        != {
+            **{prop: row[prop] for prop in properties},
+            **{field: [row[field]] for field in relations},
+        }
+    ]
+
+
+def delete_in_batches(match, variable="n", detach=True, batch_size=None, **params):
+    """Delete what match binds to variable, one transaction per batch.
+
+    Keeps each transaction small instead of deleting everything at once;
+    like write_in_batches, batches are retried on transient errors.
+    Returns the number of deleted nodes or relationships.
+    """
+    delete = "DETACH DELETE" if detach else "DELETE"
+    query = f"""
+        {match}
+        WITH {variable} LIMIT $limit
+        {delete} {variable}
+        RETURN count(*) AS deleted
+    """
+    batch_size = batch_size or write_batch_size()
+
+    deleted = 0
     driver = get_neo4j_driver()
     with driver.session() as session:
-        query = "MATCH (n) DETACH DELETE n"
-        session.run(query)
-        print("Cleaned Neo4j database")
+        while True:
+            record = session.execute_write(
+                _run_write, query, limit=batch_size, **params
+            )
+            count = record["deleted"] if record else 0
+            deleted += count
+            if count < batch_size:
+                return deleted
+
+
+def clean_database():
+    delete_in_batches("MATCH (n)")
+    reference_cache.flush()
+    print("Cleaned Neo4j database")
 
 
 def get_nodes(label):
@@ -26,3 +275,10 @@ def get_nodes(label):
         query = "MATCH (n:" + label + ") RETURN n"
         result = session.run(query)
         return [dict(record["n"]) for record in result]
+
+
+def get_projection(query, **params):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        result = session.run(query, **params)
+        return [record["item"] for record in result]
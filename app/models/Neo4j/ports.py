@@ -1,26 +1,135 @@
-from utils.harvesine import haversine
+import os
+import threading
+import time
+import uuid
 
-from .neo4j_models import get_neo4j_driver
+from utils.distance_matrix import PortDistanceMatrix, sparse_edges
+from utils.reference_cache import cached, cached_batch, invalidate, reference_cache
 
+from .neo4j_models import (
+    delete_in_batches,
+    get_changed_rows,
+    get_neo4j_driver,
+    write_in_batches,
+)
 
-def insert_ports(ports_data):
+_distance_matrix = None
+_distance_matrix_version = None
+_distance_matrix_built_at = 0.0
+_distance_matrix_lock = threading.Lock()
+
+
+def get_port_distance_matrix():
+    """Return the in-memory distance matrix of all ports.
+
+    The matrix is rebuilt when the ports tag of the reference cache is
+    invalidated by a write it was not updated for, or after the cache TTL.
+    """
+    global _distance_matrix, _distance_matrix_version, _distance_matrix_built_at
+    with _distance_matrix_lock:
+        version = reference_cache.versions(("ports",))
+        if (
+            _distance_matrix is None
+            or _distance_matrix_version != version
+            or time.monotonic() - _distance_matrix_built_at > reference_cache.ttl
+        ):
+            _distance_matrix = PortDistanceMatrix(get_all_ports())
+            _distance_matrix_version = version
+            _distance_matrix_built_at = time.monotonic()
+        return _distance_matrix
+
+
+def _update_distance_matrix(ports=(), removed=()):
+    # Called right after invalidate("ports"): recompute only the changed
+    # rows, unless another invalidation happened since the matrix was last
+    # in sync, which only a rebuild can catch up with.
+    global _distance_matrix, _distance_matrix_version
+    with _distance_matrix_lock:
+        if _distance_matrix is None:
+            return
+        (version,) = reference_cache.versions(("ports",))
+        if version != _distance_matrix_version[0] + 1:
+            _distance_matrix = None
+            return
+        for port in ports:
+            _distance_matrix.upsert(port)
+        for name in removed:
+            _distance_matrix.remove(name)
+        _distance_matrix_version = (version,)
+
+
+def upsert_ports(ports_data, batch_size=None):
+    rows = get_changed_rows(
+        "Port",
+        "name",
+        ports_data,
+        ("latitude", "longitude"),
+        {"island": ("-[:LOCATED_ON]->", "Island", "name")},
+    )
+    query = """
+        UNWIND $rows AS row
+        MATCH (i:Island {name: row.island})
+        MERGE (p:Port {name: row.name})
+        SET p.latitude = row.latitude, p.longitude = row.longitude
+        WITH p, i
+        OPTIONAL MATCH (p)-[old:LOCATED_ON]->(other:Island) WHERE other <> i
+        DELETE old
+        WITH DISTINCT p, i
+        MERGE (p)-[:LOCATED_ON]->(i)
+    """
+    write_in_batches(query, rows, batch_size=batch_size)
+    if not rows:
+        return 0
+    invalidate("ports")
+    _update_distance_matrix(
+        {
+            "name": port["name"],
+            "latitude": port["latitude"],
+            "longitude": port["longitude"],
+        }
+        for port in rows
+    )
+    return len(rows)
+
+
+def update_port_location(name, latitude, longitude):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            MATCH (p:Port {name: $name})
+            SET p.latitude = $latitude, p.longitude = $longitude
+            RETURN p
+        """
+        record = session.run(
+            query, name=name, latitude=latitude, longitude=longitude
+        ).single()
+    if not record:
+        return None
+
+    port = dict(record["p"])
+    invalidate("ports")
+    _update_distance_matrix([port])
+    return port
+
+
+def delete_port(name):
     driver = get_neo4j_driver()
     with driver.session() as session:
-        for port in ports_data:
-            query = """
-                MATCH (i:Island {name: $island_name})
-                CREATE (p:Port {name: $name, latitude: $latitude, longitude: $longitude})
-                CREATE (p)-[:LOCATED_ON]->(i)
-            """
-            session.run(
-                query,
-                name=port["name"],
-                latitude=port["latitude"],
-                longitude=port["longitude"],
-                island_name=port["island"],
-            )
+        query = """
+            MATCH (p:Port {name: $name})
+            DETACH DELETE p
+            RETURN count(*) AS deleted
+        """
+        record = session.run(query, name=name).single()
+    if not record or not record["deleted"]:
+        return False
+
+    invalidate("ports")
+    _update_distance_matrix(removed=[name])
+    return True
 
 
+@cached("ports")
 def get_all_ports():
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -29,6 +138,30 @@ def get_all_ports():
         return [dict(record["p"]) for record in result]
 
 
+@cached("ports")
+def get_ports_page(first, after=None):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            MATCH (p:Port)
+            WHERE $after IS NULL OR p.name > $after
+            RETURN p
+            ORDER BY p.name
+            LIMIT $limit
+        """
+        result = session.run(query, after=after, limit=first + 1)
+        return [dict(record["p"]) for record in result]
+
+
+@cached("ports")
+def count_ports():
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = "MATCH (p:Port) RETURN count(p) AS total"
+        return session.run(query).single()["total"]
+
+
+@cached("ports")
 def get_port(name):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -38,6 +171,7 @@ def get_port(name):
         return dict(record["p"]) if record else None
 
 
+@cached("ports")
 def get_ports_by_island(island_name):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -46,6 +180,7 @@ def get_ports_by_island(island_name):
         return [dict(record["p"]) for record in result]
 
 
+@cached("ports", "lockers")
 def get_port_by_locker(locker_id):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -55,6 +190,7 @@ def get_port_by_locker(locker_id):
         return dict(record["p"]) if record else None
 
 
+@cached("ports", "warehouses")
 def get_port_by_warehouse(name):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -64,6 +200,7 @@ def get_port_by_warehouse(name):
         return dict(record["p"]) if record else None
 
 
+@cached("ports", "seaplane_location")
 def get_port_by_seaplane(name):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -73,63 +210,149 @@ def get_port_by_seaplane(name):
         return dict(record["p"]) if record else None
 
 
-def create_port_distance_relationships():
+def route_graph_settings():
+    """How DISTANCE_TO relationships link ports.
+
+    In complete mode every pair of ports is linked; in sparse mode each port
+    is linked to its PORT_GRAPH_K nearest ports and to those within
+    PORT_GRAPH_RADIUS_KM (0 disables it), plus the links keeping the graph
+    connected.
+    """
+    return {
+        "mode": os.getenv("PORT_GRAPH_MODE", "complete"),
+        "k": int(os.getenv("PORT_GRAPH_K", "5")),
+        "radius_km": float(os.getenv("PORT_GRAPH_RADIUS_KM", "0")),
+    }
+
+
+def _complete_pairs(count):
+    # Generated lazily to keep memory at O(n)
+    for i in range(count):
+        for j in range(i + 1, count):
+            yield i, j
+
+
+def _port_distance_rows(ports, distances, pairs, generation):
+    for i, j in pairs:
+        yield {
+            "name1": ports[i]["name"],
+            "name2": ports[j]["name"],
+            "distance_km": round(float(distances[i, j]), 2),
+            "generation": generation,
+        }
+
+
+def _print_progress(written, total):
+    print(f"Port distances: {written}/{total} relationships written")
+
+
+def deduplicate_port_distances(batch_size=None):
+    """Keep a single DISTANCE_TO relationship per pair of ports.
+
+    Graphs created before links were undirected hold one relationship in
+    each direction; the undirected MERGE of create_port_distance_relationships
+    would update both. Returns the number of deleted relationships.
+    """
+    deleted = delete_in_batches(
+        "MATCH (p1:Port)-[d:DISTANCE_TO]-(p2:Port) "
+        "WHERE elementId(p1) < elementId(p2) "
+        "WITH p1, p2, collect(d) AS links WHERE size(links) > 1 "
+        "UNWIND links[1..] AS d",
+        variable="d",
+        detach=False,
+        batch_size=batch_size,
+    )
+    if deleted:
+        invalidate("ports")
+    return deleted
+
+
+def create_port_distance_relationships(
+    batch_size=None, progress=_print_progress, settings=None
+):
+    """Link ports with undirected DISTANCE_TO edges, one per linked pair.
+
+    Which pairs are linked depends on route_graph_settings(). Distances are
+    computed client-side and written in UNWIND batches of batch_size
+    (NEO4J_WRITE_BATCH_SIZE by default), one transaction each. Existing
+    edges are updated in place, then those no longer linked are deleted.
+    """
+    settings = settings or route_graph_settings()
     driver = get_neo4j_driver()
     with driver.session() as session:
         query = "MATCH (p:Port) RETURN p"
         result = session.run(query)
         ports = [dict(record["p"]) for record in result]
+    distances = PortDistanceMatrix(ports).distances
+    if settings["mode"] == "complete":
+        pairs = _complete_pairs(len(ports))
+        total = len(ports) * (len(ports) - 1) // 2
+    elif settings["mode"] == "sparse":
+        pairs = sparse_edges(distances, settings["k"], settings["radius_km"])
+        total = len(pairs)
+    else:
+        raise ValueError(f"Unknown port graph mode '{settings['mode']}'")
 
-        for i, port1 in enumerate(ports):
-            for port2 in ports[i + 1 :]:
-                distance = haversine(
-                    port1["latitude"],
-                    port1["longitude"],
-                    port2["latitude"],
-                    port2["longitude"],
-                )
-
-                query = """
-                    MATCH (p1:Port {name: $name1})
-                    MATCH (p2:Port {name: $name2})
-                    MERGE (p1)-[:DISTANCE_TO {distance_km: $distance}]->(p2)
-                    MERGE (p2)-[:DISTANCE_TO {distance_km: $distance}]->(p1)
-                """
-                session.run(
-                    query,
-                    name1=port1["name"],
-                    name2=port2["name"],
-                    distance=round(distance, 2),
-                )
-        return
-
-
-def get_nearby_ports(port_name, limit=None):
-    driver = get_neo4j_driver()
-    with driver.session() as session:
-        query = """
-            MATCH (p1:Port {name: $port_name})-[d:DISTANCE_TO]->(p2:Port)
-        """
-
-        conditions = []
-        params = {"port_name": port_name}
+    query = """
+        UNWIND $rows AS row
+        MATCH (p1:Port {name: row.name1})
+        MATCH (p2:Port {name: row.name2})
+        MERGE (p1)-[d:DISTANCE_TO]-(p2)
+        SET d.distance_km = row.distance_km, d.generation = row.generation
+    """
+    # Edges not written by this run are stale
+    generation = uuid.uuid4().hex
+    write_in_batches(
+        query,
+        _port_distance_rows(ports, distances, pairs, generation),
+        total=total,
+        batch_size=batch_size,
+        progress=progress,
+    )
+    delete_in_batches(
+        "MATCH ()-[d:DISTANCE_TO]->() WHERE d.generation <> $generation "
+        "OR d.generation IS NULL",
+        variable="d",
+        detach=False,
+        batch_size=batch_size,
+        generation=generation,
+    )
+    invalidate("ports")
 
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
 
-        query += " RETURN p2, d.distance_km as distance ORDER BY distance ASC"
+def get_nearby_ports(port_name, max_distance_km=None, limit=None):
+    matrix = get_port_distance_matrix()
+    if port_name not in matrix:
+        return []
+    return [
+        {"port": port, "distance_km": round(distance, 2)}
+        for port, distance in matrix.nearest(port_name, limit, max_distance_km)
+    ]
 
-        if limit is not None:
-            query += " LIMIT $limit"
-            params["limit"] = limit
 
-        result = session.run(query, **params)
-        return [
-            {"port": dict(record["p2"]), "distance_km": record["distance"]}
+@cached("ports")
+def get_port_graph():
+    """Adjacency lists of the DISTANCE_TO graph: name -> [(name, distance_km)]."""
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            MATCH (p:Port)
+            OPTIONAL MATCH (p)-[d:DISTANCE_TO]-(neighbour:Port)
+            RETURN p.name AS name,
+                collect([neighbour.name, d.distance_km]) AS neighbours
+        """
+        result = session.run(query)
+        return {
+            record["name"]: [
+                (neighbour, distance)
+                for neighbour, distance in record["neighbours"]
+                if neighbour is not None
+            ]
             for record in result
-        ]
+        }
 
 
+@cached("ports")
 def get_shortest_path_between_ports(start_port_name, end_port_name):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -152,3 +375,58 @@ def get_shortest_path_between_ports(start_port_name, end_port_name):
                 "num_stops": record["num_stops"],
             }
         return None
+
+
+@cached_batch("ports")
+def get_ports_by_islands(island_names):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            UNWIND $island_names AS island_name
+            MATCH (p:Port)-[:LOCATED_ON]->(i:Island {name: island_name})
+            RETURN island_name, collect(p) AS ports
+        """
+        result = session.run(query, island_names=island_names)
+        return {
+            record["island_name"]: [dict(node) for node in record["ports"]]
+            for record in result
+        }
+
+
+@cached_batch("ports", "lockers")
+def get_ports_by_lockers(locker_ids):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            UNWIND $locker_ids AS locker_id
+            MATCH (l:Locker {id: locker_id})-[:LOCATED_AT]->(p:Port)
+            RETURN locker_id, p
+        """
+        result = session.run(query, locker_ids=locker_ids)
+        return {record["locker_id"]: dict(record["p"]) for record in result}
+
+
+@cached_batch("ports", "warehouses")
+def get_ports_by_warehouses(names):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            UNWIND $names AS name
+            MATCH (w:Warehouse {name: name})-[:LOCATED_AT]->(p:Port)
+            RETURN name, p
+        """
+        result = session.run(query, names=names)
+        return {record["name"]: dict(record["p"]) for record in result}
+
+
+@cached_batch("ports", "seaplane_location")
+def get_ports_by_seaplanes(names):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            UNWIND $names AS name
+            MATCH (s:Seaplane {name: name})-[:DOCKED_AT]->(p:Port)
+            RETURN name, p
+        """
+        result = session.run(query, names=names)
+        return {record["name"]: dict(record["p"]) for record in result}
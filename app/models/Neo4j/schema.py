@@ -0,0 +1,137 @@
+import ast
+import os
+import re
+from pathlib import Path
+
+from .neo4j_models import get_neo4j_driver
+
+# (name, label, property, unique) of every node lookup key the models use
+SCHEMA = [
+    ("island_name", "Island", "name", True),
+    ("port_name", "Port", "name", True),
+    ("manufacturer_name", "Manufacturer", "name", True),
+    ("seaplane_model_name", "SeaplaneModel", "name", True),
+    ("seaplane_status_value", "SeaplaneStatus", "value", True),
+    ("seaplane_name", "Seaplane", "name", True),
+    ("locker_id", "Locker", "id", True),
+    ("locker_remaining_capacity", "Locker", "remaining_capacity", False),
+    ("warehouse_id", "Warehouse", "id", True),
+    ("warehouse_name", "Warehouse", "name", True),
+    ("client_id", "Client", "id", True),
+    ("client_name", "Client", "name", False),
+    ("migration_version", "Migration", "version", True),
+]
+
+MODELS_DIR = Path(__file__).resolve().parent
+
+_CLAUSE = re.compile(
+    r"\b(OPTIONAL MATCH|MATCH|MERGE|CREATE|SET|WHERE|ORDER BY|RETURN|WITH"
+    r"|UNWIND|DETACH DELETE|DELETE|REMOVE|CALL|SKIP|LIMIT)\b"
+)
+# (variable:Label binds a variable, (variable:Label {property: looks it up
+_BINDING = re.compile(r"\((\w+):(\w+)")
+_LOOKUP = re.compile(r"\(\w*:(\w+)\s*\{\s*(\w+)\s*:")
+_PROPERTY = re.compile(r"\b(\w+)\.(\w+)\b")
+
+
+def _index_timeout():
+    return int(os.getenv("NEO4J_INDEX_TIMEOUT", "300"))
+
+
+def _schema_queries(schema):
+    for name, label, prop, unique in schema:
+        if unique:
+            yield (
+                f"CREATE CONSTRAINT {name}_unique IF NOT EXISTS "
+                f"FOR (n:{label}) REQUIRE n.{prop} IS UNIQUE"
+            )
+        else:
+            yield f"CREATE INDEX {name} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})"
+
+
+def create_schema(schema=None, timeout=None):
+    """Create the constraints and indexes of SCHEMA, then wait for them.
+
+    Existing ones are left untouched, so this can run on every migration.
+    Uniqueness constraints come with their own index.
+    """
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        for query in _schema_queries(schema or SCHEMA):
+            session.run(query)
+        session.run(
+            "CALL db.awaitIndexes($timeout)",
+            timeout=timeout or _index_timeout(),
+        )
+
+
+def get_indexes():
+    """Map (label, property) to the state of the index covering it."""
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            SHOW INDEXES
+            YIELD entityType, labelsOrTypes, properties, state
+            WHERE entityType = 'NODE' AND size(properties) = 1
+            RETURN labelsOrTypes[0] AS label, properties[0] AS property, state
+        """
+        result = session.run(query)
+        return {
+            (record["label"], record["property"]): record["state"] for record in result
+        }
+
+
+def _lookups(query):
+    bindings = dict(_BINDING.findall(query))
+    parts = _CLAUSE.split(query)
+    lookups = set()
+    for clause, body in zip(parts[1::2], parts[2::2]):
+        if clause in ("MATCH", "OPTIONAL MATCH", "MERGE"):
+            lookups.update(_LOOKUP.findall(body))
+        elif clause in ("WHERE", "ORDER BY"):
+            lookups.update(
+                (bindings[variable], prop)
+                for variable, prop in _PROPERTY.findall(body)
+                if variable in bindings
+            )
+    return lookups
+
+
+def find_model_lookups(directory=MODELS_DIR):
+    """Map each Neo4j model function to the (label, property) keys it looks up.
+
+    Cypher queries are read from the string literals of each function.
+    """
+    lookups = {}
+    for path in sorted(directory.glob("*.py")):
+        tree = ast.parse(path.read_text(), filename=str(path))
+        for function in ast.walk(tree):
+            if not isinstance(function, ast.FunctionDef):
+                continue
+            keys = set()
+            for node in ast.walk(function):
+                if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                    if "MATCH" in node.value:
+                        keys |= _lookups(node.value)
+            if keys:
+                lookups[f"{path.stem}.{function.name}"] = sorted(keys)
+    return lookups
+
+
+def find_unindexed_lookups():
+    """Map model functions to their lookups not backed by an online index.
+
+    Each lookup is a (label, property, state) tuple, state being None when
+    no index covers it.
+    """
+    indexes = get_indexes()
+    report = {}
+    for function, keys in find_model_lookups().items():
+        missing = [
+            (label, prop, indexes.get((label, prop)))
+            for label, prop in keys
+            if indexes.get((label, prop)) != "ONLINE"
+        ]
+        if missing:
+            report[function] = missing
+    return report
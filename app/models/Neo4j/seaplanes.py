@@ -1,42 +1,71 @@
-from .neo4j_models import get_neo4j_driver
+from utils.reference_cache import invalidate
+
+from .neo4j_models import get_changed_rows, get_neo4j_driver, write_in_batches
+
+
+def upsert_seaplanes(seaplanes_data, batch_size=None):
+    # Fuel, crates, location and status are live data, only set on new
+    # seaplanes: existing ones only follow changes of their model
+    rows = get_changed_rows(
+        "Seaplane",
+        "name",
+        seaplanes_data,
+        relations={"model": ("-[:MODEL_TYPE]->", "SeaplaneModel", "name")},
+    )
+    query = """
+        UNWIND $rows AS row
+        MATCH (sm:SeaplaneModel {name: row.model})
+        MATCH (p:Port {name: row.location})
+        MATCH (st:SeaplaneStatus {value: row.status})
+        OPTIONAL MATCH (existing:Seaplane {name: row.name})
+        MERGE (s:Seaplane {name: row.name})
+        ON CREATE SET s.fuel = row.fuel, s.crates = row.crates
+        WITH s, sm, p, st, existing IS NULL AS created
+        FOREACH (_ IN CASE WHEN created THEN [1] ELSE [] END |
+            MERGE (s)-[:DOCKED_AT]->(p)
+            MERGE (s)-[:HAS_STATUS]->(st)
+        )
+        WITH s, sm
+        OPTIONAL MATCH (s)-[old:MODEL_TYPE]->(other:SeaplaneModel) WHERE other <> sm
+        DELETE old
+        WITH DISTINCT s, sm
+        MERGE (s)-[:MODEL_TYPE]->(sm)
+    """
+    write_in_batches(query, rows, batch_size=batch_size)
+    if rows:
+        invalidate("seaplanes", "seaplane_location", "seaplane_status")
+    return len(rows)
 
 
-def insert_seaplanes(seaplanes_data):
+def get_all_seaplanes():
     driver = get_neo4j_driver()
     with driver.session() as session:
-        for seaplane in seaplanes_data:
-            query = """
-                MATCH (sm:SeaplaneModel {name: $model_name})
-                MATCH (p:Port {name: $location})
-                MATCH (st:SeaplaneStatus {value: $status_value})
-                CREATE (s:Seaplane {
-                    name: $name,
-                    fuel: $fuel,
-                    crates: $crates
-                })
-                CREATE (s)-[:MODEL_TYPE]->(sm)
-                CREATE (s)-[:DOCKED_AT]->(p)
-                CREATE (s)-[:HAS_STATUS]->(st)
-            """
-            session.run(
-                query,
-                model_name=seaplane["model"],
-                name=seaplane["name"],
-                location=seaplane["location"],
-                status_value=seaplane["status"],
-                fuel=seaplane["fuel"],
-                crates=seaplane["crates"],
-            )
+        query = "MATCH (s:Seaplane) RETURN s"
+        result = session.run(query)
+        return [dict(record["s"]) for record in result]
 
 
-def get_all_seaplanes():
+def get_seaplanes_page(first, after=None):
     driver = get_neo4j_driver()
     with driver.session() as session:
-        query = "MATCH (s:Seaplane) RETURN s"
-        result = session.run(query)
+        query = """
+            MATCH (s:Seaplane)
+            WHERE $after IS NULL OR s.name > $after
+            RETURN s
+            ORDER BY s.name
+            LIMIT $limit
+        """
+        result = session.run(query, after=after, limit=first + 1)
         return [dict(record["s"]) for record in result]
 
 
+def count_seaplanes():
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = "MATCH (s:Seaplane) RETURN count(s) AS total"
+        return session.run(query).single()["total"]
+
+
 def get_seaplane(name):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -108,7 +137,8 @@ def update_seaplane_status(name, new_status):
         """
         result = session.run(query, name=name, new_status=new_status)
         record = result.single()
-        return dict(record["s"]) if record else None
+    invalidate("seaplane_status")
+    return dict(record["s"]) if record else None
 
 
 def update_seaplane_location(name, new_port):
@@ -123,7 +153,8 @@ def update_seaplane_location(name, new_port):
         """
         result = session.run(query, name=name, new_port=new_port)
         record = result.single()
-        return dict(record["s"]) if record else None
+    invalidate("seaplane_location")
+    return dict(record["s"]) if record else None
 
 
 def get_available_seaplanes(port_name=None):
@@ -150,4 +181,50 @@ def delete_seaplane(name):
     with driver.session() as session:
         query = "MATCH (s:Seaplane {name: $name}) DETACH DELETE s"
         session.run(query, name=name)
-        return True
+    invalidate("seaplanes", "seaplane_location", "seaplane_status")
+    return True
+
+
+def get_seaplanes_by_models(model_names):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            UNWIND $model_names AS model_name
+            MATCH (s:Seaplane)-[:MODEL_TYPE]->(sm:SeaplaneModel {name: model_name})
+            RETURN model_name, collect(s) AS seaplanes
+        """
+        result = session.run(query, model_names=model_names)
+        return {
+            record["model_name"]: [dict(node) for node in record["seaplanes"]]
+            for record in result
+        }
+
+
+def get_seaplanes_by_ports(port_names):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            UNWIND $port_names AS port_name
+            MATCH (s:Seaplane)-[:DOCKED_AT]->(p:Port {name: port_name})
+            RETURN port_name, collect(s) AS seaplanes
+        """
+        result = session.run(query, port_names=port_names)
+        return {
+            record["port_name"]: [dict(node) for node in record["seaplanes"]]
+            for record in result
+        }
+
+
+def get_seaplanes_by_statuses(status_values):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            UNWIND $status_values AS status_value
+            MATCH (s:Seaplane)-[:HAS_STATUS]->(st:SeaplaneStatus {value: status_value})
+            RETURN status_value, collect(s) AS seaplanes
+        """
+        result = session.run(query, status_values=status_values)
+        return {
+            record["status_value"]: [dict(node) for node in record["seaplanes"]]
+            for record in result
+        }
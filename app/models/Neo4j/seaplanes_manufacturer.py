@@ -1,14 +1,21 @@
-from .neo4j_models import get_neo4j_driver
+from utils.reference_cache import cached, cached_batch, invalidate
 
+from .neo4j_models import get_changed_rows, get_neo4j_driver, write_in_batches
 
-def insert_seaplanes_manufacturers(manufacturers_data):
-    driver = get_neo4j_driver()
-    with driver.session() as session:
-        for manufacturer in manufacturers_data:
-            query = "CREATE (m:Manufacturer {name: $name})"
-            session.run(query, name=manufacturer["name"])
 
+def upsert_seaplanes_manufacturers(manufacturers_data, batch_size=None):
+    rows = get_changed_rows("Manufacturer", "name", manufacturers_data)
+    query = """
+        UNWIND $rows AS row
+        MERGE (m:Manufacturer {name: row.name})
+    """
+    write_in_batches(query, rows, batch_size=batch_size)
+    if rows:
+        invalidate("manufacturers")
+    return len(rows)
 
+
+@cached("manufacturers")
 def get_manufacturers():
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -17,6 +24,7 @@ def get_manufacturers():
         return [dict(record["m"]) for record in result]
 
 
+@cached("manufacturers")
 def get_manufacturer(name):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -26,6 +34,7 @@ def get_manufacturer(name):
         return dict(record["m"]) if record else None
 
 
+@cached("manufacturers", "models")
 def get_manufacturer_by_model(name):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -33,3 +42,16 @@ def get_manufacturer_by_model(name):
         result = session.run(query, name=name)
         record = result.single()
         return dict(record["m"]) if record else None
+
+
+@cached_batch("manufacturers", "models")
+def get_manufacturers_by_models(names):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            UNWIND $names AS name
+            MATCH (m:Manufacturer)<-[:MANUFACTURED_BY]-(sm:SeaplaneModel {name: name})
+            RETURN name, m
+        """
+        result = session.run(query, names=names)
+        return {record["name"]: dict(record["m"]) for record in result}
@@ -1,34 +1,45 @@
-from .neo4j_models import get_neo4j_driver
+from utils.reference_cache import cached, cached_batch, invalidate
 
+from .neo4j_models import get_changed_rows, get_neo4j_driver, write_in_batches
 
-def insert_seaplanes_models(models_data):
-    driver = get_neo4j_driver()
-    with driver.session() as session:
-        for model in models_data:
-            query = """
-                MATCH (m:Manufacturer {name: $manufacturer})
-                CREATE (sm:SeaplaneModel {
-                    name: $name,
-                    crate_capacity: $crate_capacity,
-                    fuel_consumption_L_per_km: $fuel_consumption_L_per_km,
-                    fuel_capacity_L: $fuel_capacity_L,
-                    cost_per_km_USD: $cost_per_km_USD,
-                    average_speed_kmh: $average_speed_kmh
-                })
-                CREATE (sm)-[:MANUFACTURED_BY]->(m)
-            """
-            session.run(
-                query,
-                name=model["name"],
-                manufacturer=model["manufacturer"],
-                crate_capacity=model["crate_capacity"],
-                fuel_consumption_L_per_km=model["fuel_consumption_L_per_km"],
-                fuel_capacity_L=model["fuel_capacity_L"],
-                cost_per_km_USD=model["cost_per_km_USD"],
-                average_speed_kmh=model["average_speed_kmh"],
-            )
+
+def upsert_seaplanes_models(models_data, batch_size=None):
+    rows = get_changed_rows(
+        "SeaplaneModel",
+        "name",
+        models_data,
+        (
+            "crate_capacity",
+            "fuel_consumption_L_per_km",
+            "fuel_capacity_L",
+            "cost_per_km_USD",
+            "average_speed_kmh",
+        ),
+        {"manufacturer": ("-[:MANUFACTURED_BY]->", "Manufacturer", "name")},
+    )
+    query = """
+        UNWIND $rows AS row
+        MATCH (m:Manufacturer {name: row.manufacturer})
+        MERGE (sm:SeaplaneModel {name: row.name})
+        SET sm.crate_capacity = row.crate_capacity,
+            sm.fuel_consumption_L_per_km = row.fuel_consumption_L_per_km,
+            sm.fuel_capacity_L = row.fuel_capacity_L,
+            sm.cost_per_km_USD = row.cost_per_km_USD,
+            sm.average_speed_kmh = row.average_speed_kmh
+        WITH sm, m
+        OPTIONAL MATCH (sm)-[old:MANUFACTURED_BY]->(other:Manufacturer)
+        WHERE other <> m
+        DELETE old
+        WITH DISTINCT sm, m
+        MERGE (sm)-[:MANUFACTURED_BY]->(m)
+    """
+    write_in_batches(query, rows, batch_size=batch_size)
+    if rows:
+        invalidate("models")
+    return len(rows)
 
 
+@cached("models")
 def get_all_models():
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -39,6 +50,7 @@ def get_all_models():
         return [dict(record["sm"]) for record in result]
 
 
+@cached("models")
 def get_model(name):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -48,6 +60,7 @@ def get_model(name):
         return dict(record["sm"]) if record else None
 
 
+@cached("models")
 def get_models_by_manufacturer(manufacturer_name):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -56,6 +69,7 @@ def get_models_by_manufacturer(manufacturer_name):
         return [dict(record["sm"]) for record in result]
 
 
+@cached("models", "seaplanes")
 def get_model_by_seaplane(name):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -63,3 +77,32 @@ def get_model_by_seaplane(name):
         result = session.run(query, name=name)
         record = result.single()
         return dict(record["sm"]) if record else None
+
+
+@cached_batch("models")
+def get_models_by_manufacturers(manufacturer_names):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            UNWIND $manufacturer_names AS manufacturer_name
+            MATCH (sm:SeaplaneModel)-[:MANUFACTURED_BY]->(m:Manufacturer {name: manufacturer_name})
+            RETURN manufacturer_name, collect(sm) AS models
+        """
+        result = session.run(query, manufacturer_names=manufacturer_names)
+        return {
+            record["manufacturer_name"]: [dict(node) for node in record["models"]]
+            for record in result
+        }
+
+
+@cached_batch("models", "seaplanes")
+def get_models_by_seaplanes(names):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            UNWIND $names AS name
+            MATCH (s:Seaplane {name: name})-[:MODEL_TYPE]->(sm:SeaplaneModel)
+            RETURN name, sm
+        """
+        result = session.run(query, names=names)
+        return {record["name"]: dict(record["sm"]) for record in result}
@@ -1,16 +1,21 @@
-from .neo4j_models import get_neo4j_driver
+from utils.reference_cache import cached, cached_batch, invalidate
 
+from .neo4j_models import get_changed_rows, get_neo4j_driver, write_in_batches
 
-def insert_seaplanes_status(status_data):
-    driver = get_neo4j_driver()
-    with driver.session() as session:
-        for status in status_data:
-            value = status["value"]
 
-            query = "CREATE (st:SeaplaneStatus {value: $value})"
-            session.run(query, value=value)
+def upsert_seaplanes_status(status_data, batch_size=None):
+    rows = get_changed_rows("SeaplaneStatus", "value", status_data)
+    query = """
+        UNWIND $rows AS row
+        MERGE (st:SeaplaneStatus {value: row.value})
+    """
+    write_in_batches(query, rows, batch_size=batch_size)
+    if rows:
+        invalidate("statuses")
+    return len(rows)
 
 
+@cached("statuses")
 def get_all_status():
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -19,6 +24,7 @@ def get_all_status():
         return [dict(record["st"]) for record in result]
 
 
+@cached("statuses")
 def get_status(value):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -28,6 +34,7 @@ def get_status(value):
         return dict(record["st"]) if record else None
 
 
+@cached("statuses", "seaplane_status")
 def get_status_by_seaplane(name):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -35,3 +42,16 @@ def get_status_by_seaplane(name):
         result = session.run(query, name=name)
         record = result.single()
         return dict(record["st"]) if record else None
+
+
+@cached_batch("statuses", "seaplane_status")
+def get_statuses_by_seaplanes(names):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            UNWIND $names AS name
+            MATCH (s:Seaplane {name: name})-[:HAS_STATUS]->(st:SeaplaneStatus)
+            RETURN name, st
+        """
+        result = session.run(query, names=names)
+        return {record["name"]: dict(record["st"]) for record in result}
@@ -1,24 +1,34 @@
-from .neo4j_models import get_neo4j_driver
+from utils.reference_cache import cached, cached_batch, invalidate
 
+from .neo4j_models import get_changed_rows, get_neo4j_driver, write_in_batches
 
-def insert_warehouse(warehouse_data):
-    driver = get_neo4j_driver()
-    with driver.session() as session:
-        for warehouse in warehouse_data:
-            query = """
-                MATCH (p:Port {name: $port_name})
-                CREATE (w:Warehouse {name: $name, id: $id})
-                CREATE (w)-[:LOCATED_AT]->(p)
-                RETURN w
-            """
-            session.run(
-                query,
-                port_name=warehouse["port"],
-                name=warehouse["name"],
-                id=warehouse["id"],
-            )
+
+def upsert_warehouse(warehouse_data, batch_size=None):
+    rows = get_changed_rows(
+        "Warehouse",
+        "id",
+        warehouse_data,
+        ("name",),
+        {"port": ("-[:LOCATED_AT]->", "Port", "name")},
+    )
+    query = """
+        UNWIND $rows AS row
+        MATCH (p:Port {name: row.port})
+        MERGE (w:Warehouse {id: row.id})
+        SET w.name = row.name
+        WITH w, p
+        OPTIONAL MATCH (w)-[old:LOCATED_AT]->(other:Port) WHERE other <> p
+        DELETE old
+        WITH DISTINCT w, p
+        MERGE (w)-[:LOCATED_AT]->(p)
+    """
+    write_in_batches(query, rows, batch_size=batch_size)
+    if rows:
+        invalidate("warehouses")
+    return len(rows)
 
 
+@cached("warehouses")
 def get_all_warehouses():
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -27,6 +37,7 @@ def get_all_warehouses():
         return [dict(record["w"]) for record in result]
 
 
+@cached("warehouses")
 def get_warehouse(name):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -36,6 +47,7 @@ def get_warehouse(name):
         return dict(record["w"]) if record else None
 
 
+@cached("warehouses")
 def get_warehouse_by_id(id):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -45,6 +57,7 @@ def get_warehouse_by_id(id):
         return dict(record["w"]) if record else None
 
 
+@cached("warehouses")
 def get_warehouse_by_port(port_name):
     driver = get_neo4j_driver()
     with driver.session() as session:
@@ -54,3 +67,29 @@ def get_warehouse_by_port(port_name):
         result = session.run(query, port_name=port_name)
         record = result.single()
         return dict(record["w"]) if record else None
+
+
+@cached_batch("warehouses")
+def get_warehouses_by_ids(ids):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            UNWIND $ids AS id
+            MATCH (w:Warehouse {id: id})
+            RETURN id, w
+        """
+        result = session.run(query, ids=ids)
+        return {record["id"]: dict(record["w"]) for record in result}
+
+
+@cached_batch("warehouses")
+def get_warehouses_by_ports(port_names):
+    driver = get_neo4j_driver()
+    with driver.session() as session:
+        query = """
+            UNWIND $port_names AS port_name
+            MATCH (w:Warehouse)-[:LOCATED_AT]->(p:Port {name: port_name})
+            RETURN port_name, w
+        """
+        result = session.run(query, port_names=port_names)
+        return {record["port_name"]: dict(record["w"]) for record in result}
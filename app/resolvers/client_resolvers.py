@@ -1,14 +1,37 @@
 from models.Neo4j.clients import (
+    count_clients,
     get_all_clients,
     get_client_by_name,
+    get_clients_page,
+)
+from resolvers.loaders import get_loaders, register_connection
+from utils.pagination import (
+    build_connection,
+    cursor_integer,
+    cursor_string,
+    decode_cursor,
+    page_size,
 )
-from models.Neo4j.lockers import get_locker_for_client
 
 
 def resolve_clients(obj, info):
     return get_all_clients()
 
 
+def resolve_clients_connection(obj, info, first=None, after=None):
+    first = page_size(first)
+    cursor = decode_cursor(after, (cursor_string, cursor_integer)) or (None, None)
+    clients = get_clients_page(first, after_name=cursor[0], after_id=cursor[1])
+    connection = build_connection(
+        clients,
+        first,
+        after,
+        lambda client: [client["name"], client["id"]],
+        count_clients,
+    )
+    return register_connection(info, connection)
+
+
 def resolve_client(obj, info, name):
     return get_client_by_name(name)
 
@@ -16,5 +39,5 @@ def resolve_client(obj, info, name):
 def resolve_client_locker(obj, info):
     client = obj.get("name")
     if client:
-        return get_locker_for_client(client)
+        return get_loaders(info).locker_by_client.load(info, client)
     return None
@@ -0,0 +1,15 @@
+from services.delivery_planning_service import plan_deliveries
+from services.dispatch_service import assign_orders
+from services.trip_estimate_service import estimate_trip
+
+
+def resolve_delivery_plan(obj, info, timeBudgetMs=None):
+    return plan_deliveries(timeBudgetMs)
+
+
+def resolve_order_assignments(obj, info):
+    return assign_orders()
+
+
+def resolve_trip_estimates(obj, info, startPort=None, endPort=None, orderId=None):
+    return estimate_trip(startPort, endPort, orderId)
@@ -1,5 +1,5 @@
 from models.Neo4j.islands import get_island, get_islands
-from models.Neo4j.ports import get_ports_by_island
+from resolvers.loaders import get_loaders
 
 
 def resolve_islands(obj, info):
@@ -13,5 +13,5 @@ def resolve_island(obj, info, name):
 def resolve_island_ports(obj, info):
     island = obj.get("name")
     if island:
-        return get_ports_by_island(island)
+        return get_loaders(info).ports_by_island.load(info, island)
     return []
@@ -0,0 +1,107 @@
+from models.Neo4j.clients import get_clients_by_ids, get_clients_by_lockers
+from models.Neo4j.islands import get_islands_by_ports
+from models.Neo4j.lockers import (
+    get_lockers,
+    get_lockers_by_ports,
+    get_lockers_for_clients,
+)
+from models.Neo4j.ports import (
+    get_ports_by_islands,
+    get_ports_by_lockers,
+    get_ports_by_seaplanes,
+    get_ports_by_warehouses,
+)
+from models.Neo4j.seaplanes import (
+    get_seaplanes_by_models,
+    get_seaplanes_by_ports,
+    get_seaplanes_by_statuses,
+)
+from models.Neo4j.seaplanes_manufacturer import get_manufacturers_by_models
+from models.Neo4j.seaplanes_models import (
+    get_models_by_manufacturers,
+    get_models_by_seaplanes,
+)
+from models.Neo4j.seaplanes_status import get_statuses_by_seaplanes
+from models.Neo4j.warehouse import get_warehouses_by_ids, get_warehouses_by_ports
+from utils.dataloader import DataLoader, SiblingRegistry, field_level
+
+
+class Loaders:
+    """Loaders for every nested field, created once per GraphQL request."""
+
+    def __init__(self):
+        self.registry = SiblingRegistry()
+        registry = self.registry
+
+        # Island
+        self.ports_by_island = DataLoader(registry, get_ports_by_islands, "name", [])
+
+        # Port
+        self.island_by_port = DataLoader(registry, get_islands_by_ports, "name")
+        self.locker_by_port = DataLoader(registry, get_lockers_by_ports, "name")
+        self.warehouse_by_port = DataLoader(registry, get_warehouses_by_ports, "name")
+        self.seaplanes_by_port = DataLoader(
+            registry, get_seaplanes_by_ports, "name", []
+        )
+
+        # Client
+        self.locker_by_client = DataLoader(registry, get_lockers_for_clients, "name")
+
+        # Locker
+        self.clients_by_locker = DataLoader(registry, get_clients_by_lockers, "id", [])
+        self.port_by_locker = DataLoader(registry, get_ports_by_lockers, "id")
+
+        # Warehouse
+        self.port_by_warehouse = DataLoader(registry, get_ports_by_warehouses, "name")
+
+        # Seaplane
+        self.port_by_seaplane = DataLoader(registry, get_ports_by_seaplanes, "name")
+        self.model_by_seaplane = DataLoader(registry, get_models_by_seaplanes, "name")
+        self.status_by_seaplane = DataLoader(
+            registry, get_statuses_by_seaplanes, "name"
+        )
+
+        # SeaplaneModel
+        self.manufacturer_by_model = DataLoader(
+            registry, get_manufacturers_by_models, "name"
+        )
+        self.seaplanes_by_model = DataLoader(
+            registry, get_seaplanes_by_models, "name", []
+        )
+
+        # Manufacturer
+        self.models_by_manufacturer = DataLoader(
+            registry, get_models_by_manufacturers, "name", []
+        )
+
+        # SeaplaneStatus
+        self.seaplanes_by_status = DataLoader(
+            registry, get_seaplanes_by_statuses, "value", []
+        )
+
+        # Order
+        self.client_by_id = DataLoader(registry, get_clients_by_ids, "client_id")
+        self.warehouse_by_id = DataLoader(
+            registry, get_warehouses_by_ids, "warehouse_id"
+        )
+        self.locker_by_id = DataLoader(registry, get_lockers, "locker_id")
+
+
+def get_loaders(info):
+    return info.context["loaders"]
+
+
+def sibling_middleware(resolver, obj, info, **args):
+    """Record every resolved object so loaders can batch over its level."""
+    value = resolver(obj, info, **args)
+    if isinstance(value, (dict, list)):
+        get_loaders(info).registry.add(info.path, value)
+    return value
+
+
+def register_connection(info, connection):
+    """Register the nodes of a connection before their fields are resolved."""
+    level = field_level(info.path) + ("edges", "node")
+    nodes = [edge["node"] for edge in connection["edges"]]
+    get_loaders(info).registry.extend(level, nodes)
+    return connection
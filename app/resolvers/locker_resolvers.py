@@ -1,13 +1,16 @@
-from models.Neo4j.clients import get_clients_by_locker
 from models.Neo4j.lockers import (
     get_all_lockers,
     get_locker,
     get_lockers_with_available_capacity,
 )
-from models.Neo4j.ports import get_port_by_locker
+from resolvers.loaders import get_loaders
+from resolvers.query_planner import resolve_planned
 
 
 def resolve_lockers(obj, info):
+    planned = resolve_planned(info)
+    if planned is not None:
+        return planned
     return get_all_lockers()
 
 
@@ -23,12 +26,12 @@ def resolve_lockers_with_available_capacity(obj, info, minCapacity=1):
 def resolve_locker_port(obj, info):
     locker_id = obj.get("id")
     if locker_id:
-        return get_port_by_locker(locker_id)
+        return get_loaders(info).port_by_locker.load(info, locker_id)
     return None
 
 
 def resolve_locker_clients(obj, info):
     locker_id = obj.get("id")
     if locker_id:
-        return get_clients_by_locker(locker_id)
+        return get_loaders(info).clients_by_locker.load(info, locker_id)
     return []
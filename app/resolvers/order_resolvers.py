@@ -1,22 +1,55 @@
 from models.Mongo.orders import (
     cancel_order,
+    count_orders,
     create_order,
     get_all_orders,
     get_order_by_id,
     get_orders_by_client,
     get_orders_by_status,
     get_orders_by_warehouse,
+    get_orders_page,
     update_order_status,
 )
 from models.Neo4j.clients import get_client_by_id
-from models.Neo4j.lockers import get_locker, get_locker_for_client
+from models.Neo4j.lockers import get_locker_for_client
 from models.Neo4j.warehouse import get_warehouse_by_id
+from resolvers.loaders import get_loaders, register_connection
+from utils.pagination import (
+    build_connection,
+    cursor_datetime,
+    cursor_object_id,
+    decode_cursor,
+    page_size,
+)
 
 
 def resolve_orders(obj, info):
     return get_all_orders()
 
 
+def resolve_orders_connection(
+    obj, info, first=None, after=None, clientId=None, warehouseId=None, status=None
+):
+    first = page_size(first)
+    cursor = decode_cursor(after, (cursor_datetime, cursor_object_id))
+
+    orders = get_orders_page(
+        first,
+        after=cursor,
+        client_id=clientId,
+        warehouse_id=warehouseId,
+        status=status,
+    )
+    connection = build_connection(
+        orders,
+        first,
+        after,
+        lambda order: [order["created_at"].isoformat(), order["id"]],
+        lambda: count_orders(clientId, warehouseId, status),
+    )
+    return register_connection(info, connection)
+
+
 def resolve_order(obj, info, id):
     return get_order_by_id(id)
 
@@ -140,19 +173,19 @@ def resolve_cancel_order(obj, info, orderId, reason=None):
 def resolve_order_client(order, info):
     client = order.get("client_id")
     if client:
-        return get_client_by_id(client)
+        return get_loaders(info).client_by_id.load(info, client)
     return None
 
 
 def resolve_order_warehouse(order, info):
     warehouse = order.get("warehouse_id")
     if warehouse:
-        return get_warehouse_by_id(warehouse)
+        return get_loaders(info).warehouse_by_id.load(info, warehouse)
     return None
 
 
 def resolve_order_locker(order, info):
     locker = order.get("locker_id")
     if locker:
-        return get_locker(locker)
+        return get_loaders(info).locker_by_id.load(info, locker)
     return None
@@ -1,19 +1,38 @@
-from models.Neo4j.islands import get_island_by_port
-from models.Neo4j.lockers import get_locker_by_port
 from models.Neo4j.ports import (
+    count_ports,
     get_all_ports,
     get_nearby_ports,
     get_port,
-    get_shortest_path_between_ports,
+    get_ports_page,
+)
+from resolvers.loaders import get_loaders, register_connection
+from resolvers.query_planner import resolve_planned
+from services.routing_service import find_shortest_route
+from utils.pagination import (
+    build_connection,
+    cursor_string,
+    decode_cursor,
+    page_size,
 )
-from models.Neo4j.seaplanes import get_seaplanes_by_port
-from models.Neo4j.warehouse import get_warehouse_by_port
 
 
 def resolve_ports(obj, info):
+    planned = resolve_planned(info)
+    if planned is not None:
+        return planned
     return get_all_ports()
 
 
+def resolve_ports_connection(obj, info, first=None, after=None):
+    first = page_size(first)
+    cursor = decode_cursor(after, (cursor_string,))
+    ports = get_ports_page(first, after=cursor[0] if cursor else None)
+    connection = build_connection(
+        ports, first, after, lambda port: [port["name"]], count_ports
+    )
+    return register_connection(info, connection)
+
+
 def resolve_port(obj, info, name):
     return get_port(name)
 
@@ -21,28 +40,28 @@ def resolve_port(obj, info, name):
 def resolve_port_island(obj, info):
     port = obj.get("name")
     if port:
-        return get_island_by_port(port)
+        return get_loaders(info).island_by_port.load(info, port)
     return None
 
 
 def resolve_port_locker(obj, info):
     port = obj.get("name")
     if port:
-        return get_locker_by_port(port)
+        return get_loaders(info).locker_by_port.load(info, port)
     return None
 
 
 def resolve_port_warehouse(obj, info):
     port = obj.get("name")
     if port:
-        return get_warehouse_by_port(port)
+        return get_loaders(info).warehouse_by_port.load(info, port)
     return None
 
 
 def resolve_port_seaplanes(obj, info):
     port = obj.get("name")
     if port:
-        return get_seaplanes_by_port(port)
+        return get_loaders(info).seaplanes_by_port.load(info, port)
     return None
 
 
@@ -57,6 +76,6 @@ def resolve_nearby_ports(obj, info, portName, maxDistanceKm=None, limit=None):
 def resolve_shortest_path_between_ports(obj, info, startPort, endPort):
     """
     Resolve shortest path between two ports query.
-    Returns the shortest path using Dijkstra's algorithm based on distance weights.
+    Returns the shortest path using A* over the in-memory port graph.
     """
-    return get_shortest_path_between_ports(startPort, endPort)
+    return find_shortest_route(startPort, endPort)
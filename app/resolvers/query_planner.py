@@ -0,0 +1,160 @@
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLObjectType,
+    InlineFragmentNode,
+    get_named_type,
+)
+from models.Neo4j.neo4j_models import get_projection
+
+# Marks objects whose nested fields were already fetched by a planned query
+PLANNED_KEY = "_planned"
+
+# Relationships followed by the planner, per GraphQL type and field:
+# (pattern from the parent node, label of the related node, is a list)
+RELATIONS = {
+    "Island": {
+        "ports": ("<-[:LOCATED_ON]-", "Port", True),
+    },
+    "Port": {
+        "island": ("-[:LOCATED_ON]->", "Island", False),
+        "locker": ("<-[:LOCATED_AT]-", "Locker", False),
+        "warehouse": ("<-[:LOCATED_AT]-", "Warehouse", False),
+        "seaplanes": ("<-[:DOCKED_AT]-", "Seaplane", True),
+    },
+    "Client": {
+        "locker": ("-[:ASSIGNED_TO]->", "Locker", False),
+    },
+    "Locker": {
+        "port": ("-[:LOCATED_AT]->", "Port", False),
+        "clients": ("<-[:ASSIGNED_TO]-", "Client", True),
+    },
+    "Warehouse": {
+        "port": ("-[:LOCATED_AT]->", "Port", False),
+    },
+    "Seaplane": {
+        "model": ("-[:MODEL_TYPE]->", "SeaplaneModel", False),
+        "status": ("-[:HAS_STATUS]->", "SeaplaneStatus", False),
+        "location": ("-[:DOCKED_AT]->", "Port", False),
+    },
+    "SeaplaneModel": {
+        "manufacturer": ("-[:MANUFACTURED_BY]->", "Manufacturer", False),
+        "seaplanes": ("<-[:MODEL_TYPE]-", "Seaplane", True),
+    },
+    "Manufacturer": {
+        "models": ("<-[:MANUFACTURED_BY]-", "SeaplaneModel", True),
+    },
+    "SeaplaneStatus": {
+        "seaplanes": ("<-[:HAS_STATUS]-", "Seaplane", True),
+    },
+}
+
+# MATCH clause of each planned root field, binding the root node to n0
+ROOT_PATTERNS = {
+    "seaplanes": "MATCH (n0:Seaplane)",
+    "ports": "MATCH (n0:Port)",
+    "lockers": "MATCH (n0:Locker)",
+    "seaplaneModels": "MATCH (n0:SeaplaneModel)-[:MANUFACTURED_BY]->(:Manufacturer)",
+}
+
+
+class CannotPlan(Exception):
+    pass
+
+
+def _collect_fields(selection_set, fragments, fields):
+    # Merge the selections by field name: the planned objects are keyed by
+    # field name and aliases are applied by the executor.
+    for selection in selection_set.selections:
+        if selection.directives:
+            raise CannotPlan("directives are not planned")
+        if isinstance(selection, FieldNode):
+            if selection.arguments:
+                raise CannotPlan("nested arguments are not planned")
+            fields.setdefault(selection.name.value, []).append(selection)
+        elif isinstance(selection, InlineFragmentNode):
+            _collect_fields(selection.selection_set, fragments, fields)
+        elif isinstance(selection, FragmentSpreadNode):
+            fragment = fragments[selection.name.value]
+            _collect_fields(fragment.selection_set, fragments, fields)
+    return fields
+
+
+def _projection(graphql_type, variable, nodes, fragments, depth):
+    fields = {}
+    for node in nodes:
+        _collect_fields(node.selection_set, fragments, fields)
+
+    entries = [f"{PLANNED_KEY}: true"]
+    for name, field_nodes in fields.items():
+        if name.startswith("__"):
+            continue
+        field = graphql_type.fields.get(name)
+        field_type = get_named_type(field.type)
+        if not isinstance(field_type, GraphQLObjectType):
+            entries.append("." + name)
+            continue
+
+        relation = RELATIONS.get(graphql_type.name, {}).get(name)
+        if relation is None:
+            raise CannotPlan(f"{graphql_type.name}.{name} has no relationship")
+        pattern, label, is_list = relation
+        child = f"n{depth + 1}_{name}"
+        inner = _projection(field_type, child, field_nodes, fragments, depth + 1)
+        comprehension = f"[({variable}){pattern}({child}:{label}) | {inner}]"
+        if not is_list:
+            comprehension = f"head({comprehension})"
+        entries.append(f"{name}: {comprehension}")
+
+    return variable + " { " + ", ".join(entries) + " }"
+
+
+def _follows_relations(graphql_type, nodes, fragments):
+    fields = {}
+    for node in nodes:
+        _collect_fields(node.selection_set, fragments, fields)
+    return any(
+        name in graphql_type.fields
+        and isinstance(
+            get_named_type(graphql_type.fields[name].type), GraphQLObjectType
+        )
+        for name in fields
+    )
+
+
+def plan_query(info):
+    """Compile the selection of a root field into one Cypher query.
+
+    Returns None when the root field or part of its selection is not
+    supported, in which case the regular resolvers should be used. Flat
+    selections are not planned either: the regular resolvers serve them
+    from the reference cache.
+    """
+    match = ROOT_PATTERNS.get(info.field_name)
+    if match is None:
+        return None
+
+    graphql_type = get_named_type(info.return_type)
+    try:
+        if not _follows_relations(graphql_type, info.field_nodes, info.fragments):
+            return None
+        projection = _projection(
+            graphql_type, "n0", info.field_nodes, info.fragments, 0
+        )
+    except CannotPlan:
+        return None
+    return f"{match} RETURN {projection} AS item"
+
+
+def resolve_planned(info):
+    query = plan_query(info)
+    if query is None:
+        return None
+    return get_projection(query)
+
+
+def planned_middleware(resolver, obj, info, **args):
+    """Serve nested fields of planned objects from the prefetched tree."""
+    if isinstance(obj, dict) and PLANNED_KEY in obj and info.field_name in obj:
+        return obj[info.field_name]
+    return resolver(obj, info, **args)
@@ -2,7 +2,7 @@ from models.Neo4j.seaplanes_manufacturer import (
     get_manufacturer,
     get_manufacturers,
 )
-from models.Neo4j.seaplanes_models import get_models_by_manufacturer
+from resolvers.loaders import get_loaders
 
 
 def resolve_manufacturers(obj, info):
@@ -16,5 +16,5 @@ def resolve_manufacturer(obj, info, name):
 def resolve_manufacturer_models(obj, info):
     manufacturer = obj.get("name")
     if manufacturer:
-        return get_models_by_manufacturer(manufacturer)
+        return get_loaders(info).models_by_manufacturer.load(info, manufacturer)
     return None
@@ -1,12 +1,15 @@
-from models.Neo4j.seaplanes import get_seaplanes_by_model
-from models.Neo4j.seaplanes_manufacturer import get_manufacturer_by_model
 from models.Neo4j.seaplanes_models import (
     get_all_models,
     get_model,
 )
+from resolvers.loaders import get_loaders
+from resolvers.query_planner import resolve_planned
 
 
 def resolve_models(obj, info):
+    planned = resolve_planned(info)
+    if planned is not None:
+        return planned
     return get_all_models()
 
 
@@ -17,12 +20,12 @@ def resolve_model(obj, info, name):
 def resolve_model_manufacturer(obj, info):
     model = obj.get("name")
     if model:
-        return get_manufacturer_by_model(model)
+        return get_loaders(info).manufacturer_by_model.load(info, model)
     return None
 
 
 def resolve_model_seaplanes(obj, info):
     model = obj.get("name")
     if model:
-        return get_seaplanes_by_model(model)
+        return get_loaders(info).seaplanes_by_model.load(info, model)
     return None
@@ -1,18 +1,40 @@
 from models.Neo4j.ports import get_port_by_seaplane
 from models.Neo4j.seaplanes import (
+    count_seaplanes,
     get_all_seaplanes,
     get_available_seaplanes,
     get_seaplane,
+    get_seaplanes_page,
     update_seaplane_location,
 )
-from models.Neo4j.seaplanes_models import get_model_by_seaplane
-from models.Neo4j.seaplanes_status import get_status_by_seaplane
+from resolvers.loaders import get_loaders, register_connection
+from resolvers.query_planner import resolve_planned
+from services.routing_service import find_route_for_seaplane
+from utils.pagination import (
+    build_connection,
+    cursor_string,
+    decode_cursor,
+    page_size,
+)
 
 
 def resolve_seaplanes(obj, info):
+    planned = resolve_planned(info)
+    if planned is not None:
+        return planned
     return get_all_seaplanes()
 
 
+def resolve_seaplanes_connection(obj, info, first=None, after=None):
+    first = page_size(first)
+    cursor = decode_cursor(after, (cursor_string,))
+    seaplanes = get_seaplanes_page(first, after=cursor[0] if cursor else None)
+    connection = build_connection(
+        seaplanes, first, after, lambda seaplane: [seaplane["name"]], count_seaplanes
+    )
+    return register_connection(info, connection)
+
+
 def resolve_seaplane(obj, info, name):
     return get_seaplane(name)
 
@@ -20,24 +42,28 @@ def resolve_seaplane(obj, info, name):
 def resolve_seaplane_model(obj, info):
     seaplane = obj.get("name")
     if seaplane:
-        return get_model_by_seaplane(seaplane)
+        return get_loaders(info).model_by_seaplane.load(info, seaplane)
     return None
 
 
 def resolve_seaplane_port(obj, info):
     seaplane = obj.get("name")
     if seaplane:
-        return get_port_by_seaplane(seaplane)
+        return get_loaders(info).port_by_seaplane.load(info, seaplane)
     return None
 
 
 def resolve_seaplane_status(obj, info):
     seaplane = obj.get("name")
     if seaplane:
-        return get_status_by_seaplane(seaplane)
+        return get_loaders(info).status_by_seaplane.load(info, seaplane)
     return None
 
 
+def resolve_route_for_seaplane(obj, info, seaplane, endPort, startPort=None):
+    return find_route_for_seaplane(seaplane, endPort, startPort)
+
+
 def resolve_available_seaplanes(obj, info, portName=None):
     return get_available_seaplanes(portName)
 
@@ -1,5 +1,5 @@
-from models.Neo4j.seaplanes import get_seaplanes_by_status
 from models.Neo4j.seaplanes_status import get_all_status, get_status
+from resolvers.loaders import get_loaders
 
 
 def resolve_statuses(obj, info):
@@ -13,5 +13,5 @@ def resolve_status(obj, info, value):
 def resolve_status_seaplane(obj, info):
     status = obj.get("value")
     if status:
-        return get_seaplanes_by_status(status)
+        return get_loaders(info).seaplanes_by_status.load(info, status)
     return None
@@ -1,5 +1,5 @@
-from models.Neo4j.ports import get_port_by_warehouse
 from models.Neo4j.warehouse import get_all_warehouses, get_warehouse
+from resolvers.loaders import get_loaders
 
 
 def resolve_warehouses(obj, info):
@@ -13,5 +13,5 @@ def resolve_warehouse(obj, info, name):
 def resolve_warehouse_port(obj, info):
     warehouse = obj.get("name")
     if warehouse:
-        return get_port_by_warehouse(warehouse)
+        return get_loaders(info).port_by_warehouse.load(info, warehouse)
     return None
@@ -0,0 +1,138 @@
+import math
+import os
+import time
+
+import numpy as np
+from models.Mongo.orders import get_orders_by_status
+from models.Neo4j.ports import get_port_distance_matrix
+from models.Neo4j.seaplanes import get_available_seaplanes
+from services.fleet_service import get_fleet, get_order_ports
+from utils.tours import improve_path, path_length
+
+
+def _time_budget_ms():
+    return int(os.getenv("DELIVERY_PLANNING_TIME_BUDGET_MS", "500"))
+
+
+def _build_tour(vehicle, pending, distances):
+    """Pick up at the closest warehouse port, then deliver nearest first.
+
+    pending maps warehouse port -> locker port -> orders, oldest first;
+    loaded orders are removed from it. Returns (path, orders) or None.
+    """
+    location, capacity = vehicle["location"], vehicle["capacity"]
+
+    def fits(orders):
+        return any(order["crate_quantity"] <= capacity for order in orders)
+
+    warehouses = [
+        pickup
+        for pickup, lockers in pending.items()
+        if distances[location][pickup] <= vehicle["first_leg"]
+        and any(fits(orders) for orders in lockers.values())
+    ]
+    if not warehouses:
+        return None
+    pickup = min(warehouses, key=lambda port: distances[location][port])
+    max_leg = vehicle["max_leg"]
+
+    path, loaded, load = [pickup], [], 0
+    lockers = pending[pickup]
+    while load < capacity:
+        current = path[-1]
+        candidates = [
+            drop
+            for drop, orders in lockers.items()
+            if drop not in path[1:]
+            and distances[current][drop] <= max_leg
+            and any(order["crate_quantity"] <= capacity - load for order in orders)
+        ]
+        if not candidates:
+            break
+        drop = min(candidates, key=lambda port: distances[current][port])
+        remaining = []
+        for order in lockers[drop]:
+            if load + order["crate_quantity"] <= capacity:
+                loaded.append(order)
+                load += order["crate_quantity"]
+            else:
+                remaining.append(order)
+        if remaining:
+            lockers[drop] = remaining
+        else:
+            del lockers[drop]
+        if drop != pickup:
+            path.append(drop)
+
+    if not lockers:
+        del pending[pickup]
+    if not loaded:
+        return None
+    return path, loaded
+
+
+def plan_deliveries(time_budget_ms=None):
+    """Plan one multi-stop delivery tour per available seaplane.
+
+    Pending orders are grouped by warehouse port and locker port. Each tour
+    flies from the seaplane's port to one warehouse port, loads as many
+    orders as its free crate capacity allows and delivers them to their
+    locker ports. Tours are built greedily, then shortened with 2-opt and
+    or-opt until the time budget runs out.
+    """
+    time_budget_ms = _time_budget_ms() if time_budget_ms is None else time_budget_ms
+    deadline = time.monotonic() + time_budget_ms / 1000
+
+    orders = get_orders_by_status("pending")
+    seaplanes = get_available_seaplanes()
+    matrix = get_port_distance_matrix()
+    distances = matrix.distances.astype(np.float64).tolist()
+
+    ports = get_order_ports(orders, matrix.index) if orders else {}
+    pending = {}
+    for order in sorted(orders, key=lambda order: order["created_at"]):
+        if order["id"] in ports:
+            pickup, drop = ports[order["id"]]
+            pending.setdefault(pickup, {}).setdefault(drop, []).append(order)
+
+    # Fill the largest seaplanes first
+    fleet = get_fleet(seaplanes, matrix.index) if pending else []
+    fleet.sort(key=lambda vehicle: -vehicle["capacity"])
+    tours = []
+    for vehicle in fleet:
+        tour = _build_tour(vehicle, pending, distances)
+        if tour is not None:
+            tours.append((vehicle, *tour))
+
+    optimized = True
+    for vehicle, path, _ in tours:
+        optimized &= improve_path(path, distances, vehicle["max_leg"], deadline)
+
+    plans = []
+    assigned = set()
+    for vehicle, path, loaded in tours:
+        stops = [vehicle["location"]] + path
+        if stops[0] == stops[1]:
+            stops = path
+        distance = path_length(stops, distances)
+        assigned.update(order["id"] for order in loaded)
+        plans.append(
+            {
+                "seaplane": vehicle["seaplane"],
+                "stops": [matrix.ports[stop]["name"] for stop in stops],
+                "orders": loaded,
+                "crates": sum(order["crate_quantity"] for order in loaded),
+                "distance_km": round(distance, 2),
+                "cost_usd": round(distance * vehicle["cost_per_km"], 2),
+                "duration_h": round(distance / vehicle["speed"], 2),
+            }
+        )
+
+    return {
+        "tours": plans,
+        "total_distance_km": round(math.fsum(p["distance_km"] for p in plans), 2),
+        "total_cost_usd": round(math.fsum(p["cost_usd"] for p in plans), 2),
+        "assigned_orders": len(assigned),
+        "unassigned_orders": [o for o in orders if o["id"] not in assigned],
+        "optimized": optimized,
+    }
@@ -0,0 +1,72 @@
+import numpy as np
+from models.Mongo.orders import get_orders_by_status
+from models.Neo4j.ports import get_port_distance_matrix
+from models.Neo4j.seaplanes import get_available_seaplanes
+from services.fleet_service import get_fleet, get_order_ports
+from utils.assignment import min_cost_assignment
+
+
+def build_cost_matrix(fleet, order_ports, crates, distances):
+    """Return the (seaplanes x orders) USD cost and distance matrices.
+
+    A seaplane flies from its port to the order's warehouse port, then to
+    its locker port. Pairs over the seaplane's free crate capacity, or with
+    a leg out of fuel range, cost np.inf.
+    """
+    location = np.array([vehicle["location"] for vehicle in fleet])
+    capacity = np.array([vehicle["capacity"] for vehicle in fleet])
+    first_leg = np.array([vehicle["first_leg"] for vehicle in fleet])
+    max_leg = np.array([vehicle["max_leg"] for vehicle in fleet])
+    cost_per_km = np.array([vehicle["cost_per_km"] for vehicle in fleet])
+    pickup, drop = order_ports[:, 0], order_ports[:, 1]
+
+    to_pickup = distances[location[:, None], pickup[None, :]]
+    delivery = distances[pickup, drop]
+    distance = to_pickup + delivery[None, :]
+
+    feasible = (
+        (crates[None, :] <= capacity[:, None])
+        & (to_pickup <= first_leg[:, None])
+        & (delivery[None, :] <= max_leg[:, None])
+    )
+    cost = np.where(feasible, distance * cost_per_km[:, None], np.inf)
+    return cost, distance
+
+
+def assign_orders():
+    """Assign pending orders to docked seaplanes, one order per seaplane.
+
+    Assigns as many orders as possible, at the lowest total USD cost.
+    """
+    orders = get_orders_by_status("pending")
+    seaplanes = get_available_seaplanes()
+    matrix = get_port_distance_matrix()
+
+    ports = get_order_ports(orders, matrix.index) if orders and seaplanes else {}
+    routable = [order for order in orders if order["id"] in ports]
+    fleet = get_fleet(seaplanes, matrix.index) if routable else []
+
+    assignments = []
+    if fleet:
+        order_ports = np.array([ports[order["id"]] for order in routable])
+        crates = np.array([order["crate_quantity"] for order in routable])
+        distances = matrix.distances.astype(np.float64)
+        cost, distance = build_cost_matrix(fleet, order_ports, crates, distances)
+        for row, column in min_cost_assignment(cost):
+            assignments.append(
+                {
+                    "seaplane": fleet[row]["seaplane"],
+                    "order": routable[column],
+                    "distance_km": round(float(distance[row, column]), 2),
+                    "cost_usd": round(float(cost[row, column]), 2),
+                }
+            )
+
+    assigned_orders = {a["order"]["id"] for a in assignments}
+    assigned_seaplanes = {a["seaplane"]["name"] for a in assignments}
+    return {
+        "assignments": assignments,
+        "total_cost_usd": round(sum(a["cost_usd"] for a in assignments), 2),
+        "unassigned_orders": [o for o in orders if o["id"] not in assigned_orders],
+        "idle_seaplanes": [s for s in seaplanes if s["name"] not in assigned_seaplanes],
+    }
@@ -0,0 +1,59 @@
+from models.Neo4j.ports import (
+    get_ports_by_lockers,
+    get_ports_by_seaplanes,
+    get_ports_by_warehouses,
+)
+from models.Neo4j.seaplanes_models import get_models_by_seaplanes
+from models.Neo4j.warehouse import get_warehouses_by_ids
+
+
+def get_order_ports(orders, index):
+    """Map each order to its (warehouse port, locker port) matrix indices."""
+    warehouse_ids = list({order["warehouse_id"] for order in orders})
+    warehouses = get_warehouses_by_ids(warehouse_ids)
+    warehouse_ports = get_ports_by_warehouses(
+        [warehouse["name"] for warehouse in warehouses.values()]
+    )
+    locker_ports = get_ports_by_lockers(list({order["locker_id"] for order in orders}))
+
+    ports = {}
+    for order in orders:
+        warehouse = warehouses.get(order["warehouse_id"])
+        warehouse_port = warehouse and warehouse_ports.get(warehouse["name"])
+        locker_port = locker_ports.get(order["locker_id"])
+        if warehouse_port and locker_port:
+            pickup = index.get(warehouse_port["name"])
+            drop = index.get(locker_port["name"])
+            if pickup is not None and drop is not None:
+                ports[order["id"]] = (pickup, drop)
+    return ports
+
+
+def get_fleet(seaplanes, index):
+    """Routing parameters of the seaplanes docked at a port of the matrix."""
+    names = [seaplane["name"] for seaplane in seaplanes]
+    locations = get_ports_by_seaplanes(names)
+    models = get_models_by_seaplanes(names)
+
+    fleet = []
+    for seaplane in seaplanes:
+        location = locations.get(seaplane["name"])
+        model = models.get(seaplane["name"])
+        if not location or not model or location["name"] not in index:
+            continue
+        consumption = model["fuel_consumption_L_per_km"]
+        fleet.append(
+            {
+                "seaplane": seaplane,
+                "location": index[location["name"]],
+                "capacity": model["crate_capacity"] - seaplane.get("crates", 0),
+                # Seaplanes refuel at every port they land at
+                "max_leg": model["fuel_capacity_L"] / consumption,
+                "first_leg": min(seaplane["fuel"], model["fuel_capacity_L"])
+                / consumption,
+                "fuel_consumption": consumption,
+                "cost_per_km": model["cost_per_km_USD"],
+                "speed": model["average_speed_kmh"],
+            }
+        )
+    return fleet
@@ -0,0 +1,136 @@
+import os
+import threading
+
+from models.Neo4j.ports import (
+    get_port_by_seaplane,
+    get_port_distance_matrix,
+    get_port_graph,
+)
+from models.Neo4j.seaplanes import get_seaplane
+from models.Neo4j.seaplanes_models import get_model_by_seaplane
+from utils.routing import FuelRouteEngine, RouteEngine
+
+# DISTANCE_TO weights are rounded to 10 m while the matrix is float32: scale
+# the straight-line distance down so the A* heuristic never overestimates.
+HEURISTIC_SCALE = 0.99
+
+_engine = None
+_engine_graph = None
+_fuel_engines = {}
+_engine_lock = threading.Lock()
+
+
+class RoutingError(Exception):
+    pass
+
+
+def _route_cache_size():
+    return int(os.getenv("ROUTE_CACHE_SIZE", "1024"))
+
+
+def _straight_line_heuristic(matrix):
+    def heuristic(port, end):
+        if port not in matrix or end not in matrix:
+            return 0.0
+        return matrix.distance(port, end) * HEURISTIC_SCALE
+
+    return heuristic
+
+
+def _sync_graph(graph):
+    # The graph comes from the reference cache: when the ports change, drop
+    # every engine along with its route cache. Called with the lock held.
+    global _engine, _engine_graph, _fuel_engines
+    if _engine_graph is not graph:
+        _engine = None
+        _fuel_engines = {}
+        _engine_graph = graph
+
+
+def get_route_engine():
+    """Return the engine over the current port graph."""
+    global _engine
+    graph = get_port_graph()
+    with _engine_lock:
+        _sync_graph(graph)
+        if _engine is None:
+            _engine = RouteEngine(
+                graph,
+                _straight_line_heuristic(get_port_distance_matrix()),
+                _route_cache_size(),
+            )
+        return _engine
+
+
+def get_fuel_route_engine(model):
+    """Return the engine over the legs a seaplane model can fly."""
+    graph = get_port_graph()
+    key = (model["name"], model["fuel_capacity_L"], model["fuel_consumption_L_per_km"])
+    with _engine_lock:
+        _sync_graph(graph)
+        engine = _fuel_engines.get(key)
+        if engine is None:
+            engine = _fuel_engines[key] = FuelRouteEngine(
+                graph,
+                model["fuel_capacity_L"],
+                model["fuel_consumption_L_per_km"],
+                _straight_line_heuristic(get_port_distance_matrix()),
+                _route_cache_size(),
+            )
+        return engine
+
+
+def get_route_cache_stats():
+    with _engine_lock:
+        return {
+            "shortest_paths": _engine.stats() if _engine is not None else None,
+            "seaplane_models": {
+                name: engine.stats() for (name, _, _), engine in _fuel_engines.items()
+            },
+        }
+
+
+def find_shortest_route(start_port, end_port):
+    route = get_route_engine().shortest_path(start_port, end_port)
+    if route is None:
+        return None
+
+    ports, distance = route
+    return {
+        "ports": list(ports),
+        "total_distance_km": round(distance, 2),
+        "num_stops": len(ports) - 1,
+    }
+
+
+def find_route_for_seaplane(seaplane_name, end_port, start_port=None):
+    """Shortest route a seaplane can fly, refuelling at every port it lands at.
+
+    The first leg must fit in the fuel on board, every other leg in a full
+    tank. start_port defaults to the port the seaplane is docked at.
+    """
+    seaplane = get_seaplane(seaplane_name)
+    if not seaplane:
+        raise RoutingError(f"Seaplane '{seaplane_name}' not found")
+    model = get_model_by_seaplane(seaplane_name)
+    if not model:
+        raise RoutingError(f"Seaplane '{seaplane_name}' has no model")
+    if start_port is None:
+        port = get_port_by_seaplane(seaplane_name)
+        if not port:
+            raise RoutingError(f"Seaplane '{seaplane_name}' is not docked at a port")
+        start_port = port["name"]
+
+    engine = get_fuel_route_engine(model)
+    route = engine.shortest_path(start_port, end_port, seaplane["fuel"])
+    if route is None:
+        return None
+
+    ports, distance = route
+    return {
+        "seaplane": seaplane,
+        "ports": list(ports),
+        "total_distance_km": round(distance, 2),
+        "num_stops": len(ports) - 1,
+        "fuel_required_L": round(distance * model["fuel_consumption_L_per_km"], 2),
+    }
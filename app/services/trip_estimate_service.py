@@ -0,0 +1,117 @@
+import numpy as np
+from models.Mongo.orders import get_order_by_id
+from models.Neo4j.ports import get_port_distance_matrix
+from models.Neo4j.seaplanes import get_all_seaplanes
+from models.Neo4j.seaplanes_models import get_all_models
+from services.fleet_service import get_fleet, get_order_ports
+
+
+class TripEstimateError(Exception):
+    pass
+
+
+def _trip(matrix, start_port, end_port, order_id):
+    """Return the (start, end) matrix indices of a trip and its crates."""
+    if order_id is not None:
+        order = get_order_by_id(order_id)
+        if not order:
+            raise TripEstimateError(f"Order '{order_id}' not found")
+        ports = get_order_ports([order], matrix.index)
+        if order["id"] not in ports:
+            raise TripEstimateError(f"No ports found for order '{order_id}'")
+        start, end = ports[order["id"]]
+        return start, end, order["crate_quantity"]
+
+    if start_port is None or end_port is None:
+        raise TripEstimateError("Either startPort and endPort or orderId is required")
+    for port in (start_port, end_port):
+        if port not in matrix:
+            raise TripEstimateError(f"Port '{port}' not found")
+    return matrix.index[start_port], matrix.index[end_port], None
+
+
+def _column(items, key):
+    return np.array([item[key] for item in items], dtype=np.float64)
+
+
+def _estimates(distance, speed, consumption, cost_per_km):
+    return {
+        "flight_time_h": np.round(distance / speed, 2).tolist(),
+        "fuel_burn_L": np.round(distance * consumption, 2).tolist(),
+        "cost_usd": np.round(distance * cost_per_km, 2).tolist(),
+    }
+
+
+def _rows(items, key, columns):
+    return [
+        {key: item, **{name: values[i] for name, values in columns.items()}}
+        for i, item in enumerate(items)
+    ]
+
+
+def estimate_trip(start_port=None, end_port=None, order_id=None):
+    """Flight time, fuel burn and USD cost of a trip for the whole fleet.
+
+    The trip goes from start_port to end_port, or from an order's warehouse
+    port to its locker port. Each seaplane first flies from its current port
+    to the start of the trip, while model estimates cover the trip alone.
+    Seaplanes refuel at every port they land at, so a trip is feasible when
+    the first leg fits in the fuel on board and the trip in a full tank.
+    """
+    matrix = get_port_distance_matrix()
+    start, end, crates = _trip(matrix, start_port, end_port, order_id)
+    trip_km = float(matrix.distances[start, end])
+
+    # Each seaplane flies from its port to the start of the trip first
+    fleet = get_fleet(get_all_seaplanes(), matrix.index)
+    locations = _column(fleet, "location").astype(np.intp)
+    positioning = matrix.distances[locations, start].astype(np.float64)
+    total = positioning + trip_km
+    feasible = (positioning <= _column(fleet, "first_leg")) & (
+        trip_km <= _column(fleet, "max_leg")
+    )
+    if crates is not None:
+        feasible &= crates <= _column(fleet, "capacity")
+    seaplanes = _rows(
+        [vehicle["seaplane"] for vehicle in fleet],
+        "seaplane",
+        {
+            "positioning_km": np.round(positioning, 2).tolist(),
+            "total_distance_km": np.round(total, 2).tolist(),
+            **_estimates(
+                total,
+                _column(fleet, "speed"),
+                _column(fleet, "fuel_consumption"),
+                _column(fleet, "cost_per_km"),
+            ),
+            "feasible": feasible.tolist(),
+        },
+    )
+
+    models = get_all_models()
+    consumption = _column(models, "fuel_consumption_L_per_km")
+    feasible = trip_km <= _column(models, "fuel_capacity_L") / consumption
+    if crates is not None:
+        feasible &= crates <= _column(models, "crate_capacity")
+    models = _rows(
+        models,
+        "model",
+        {
+            **_estimates(
+                trip_km,
+                _column(models, "average_speed_kmh"),
+                consumption,
+                _column(models, "cost_per_km_USD"),
+            ),
+            "feasible": feasible.tolist(),
+        },
+    )
+
+    return {
+        "start_port": matrix.ports[start]["name"],
+        "end_port": matrix.ports[end]["name"],
+        "distance_km": round(trip_km, 2),
+        "crates": crates,
+        "seaplanes": seaplanes,
+        "models": models,
+    }
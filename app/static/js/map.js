@@ -250,16 +250,60 @@ const PORTS_QUERY = `
     }
 `;
 
-// Fetch port data and add markers
-async function loadPorts() {
-  try {
+// Hex encoded sha256 of a query, as expected by persisted queries
+async function sha256(text) {
+  const digest = await crypto.subtle.digest(
+    "SHA-256",
+    new TextEncoder().encode(text),
+  );
+  return Array.from(new Uint8Array(digest))
+    .map(function (b) {
+      return b.toString(16).padStart(2, "0");
+    })
+    .join("");
+}
+
+// Run a read-only query as a persisted GET request so the browser and
+// proxies can cache it, registering the query on first use
+async function fetchPersistedQuery(query) {
+  if (!window.crypto || !crypto.subtle) {
     const response = await fetch("/graphql", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ query: PORTS_QUERY }),
+      body: JSON.stringify({ query: query }),
     });
+    return response.json();
+  }
 
-    const result = await response.json();
+  const extensions = {
+    persistedQuery: { version: 1, sha256Hash: await sha256(query) },
+  };
+  const url =
+    "/graphql?extensions=" + encodeURIComponent(JSON.stringify(extensions));
+
+  let result = await (await fetch(url)).json();
+  const notFound =
+    result.errors &&
+    result.errors.some(function (e) {
+      return e.extensions && e.extensions.code === "PERSISTED_QUERY_NOT_FOUND";
+    });
+  if (notFound) {
+    // Registering runs the query too: later GETs hit the registry of
+    // whichever worker answered, this one may not share it
+    const response = await fetch("/graphql", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ query: query, extensions: extensions }),
+    });
+    result = await response.json();
+  }
+  return result;
+}
+
+// Fetch port data and add markers
+async function loadPorts() {
+  try {
+    const result = await fetchPersistedQuery(PORTS_QUERY);
 
     if (result.data && result.data.ports) {
       result.data.ports.forEach(function (port) {
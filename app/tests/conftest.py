@@ -0,0 +1,59 @@
+import os
+
+import pymongo
+import pytest
+from neo4j.exceptions import Neo4jError, ServiceUnavailable
+from pymongo.errors import PyMongoError
+
+from models.Mongo.mongo_models import close_mongo_client, get_mongo_db
+from models.Neo4j.neo4j_models import close_neo4j_driver, get_neo4j_driver
+
+
+@pytest.fixture
+def mongo_db(monkeypatch):
+    """An empty MongoDB database, dropped afterwards.
+
+    Uses the server of MONGO_URI and the MONGO_TEST_DATABASE database;
+    tests using it are skipped when no server answers.
+    """
+    if not os.getenv("MONGO_URI"):
+        pytest.skip("MONGO_URI is not set")
+    monkeypatch.setenv(
+        "MONGO_DATABASE", os.getenv("MONGO_TEST_DATABASE", "galapagos_test")
+    )
+    close_mongo_client()
+    db = get_mongo_db()
+    try:
+        with pymongo.timeout(2):
+            db.client.drop_database(db.name)
+    except PyMongoError as e:
+        close_mongo_client()
+        pytest.skip(f"MongoDB is not available: {e}")
+
+    yield db
+
+    db.client.drop_database(db.name)
+    close_mongo_client()
+
+
+@pytest.fixture
+def neo4j_driver():
+    """The driver of the NEO4J_URI server.
+
+    Tests using it are skipped when no server answers; they must only touch
+    nodes they create and delete them afterwards.
+    """
+    if not all(
+        os.getenv(name) for name in ("NEO4J_URI", "NEO4J_USER", "NEO4J_PASSWORD")
+    ):
+        pytest.skip("NEO4J_URI, NEO4J_USER or NEO4J_PASSWORD is not set")
+    driver = get_neo4j_driver()
+    try:
+        driver.verify_connectivity()
+    except (Neo4jError, ServiceUnavailable, OSError) as e:
+        close_neo4j_driver()
+        pytest.skip(f"Neo4j is not available: {e}")
+
+    yield driver
+
+    close_neo4j_driver()
@@ -0,0 +1,32 @@
+import pytest
+
+from data.ports import ports_data
+from utils.distance_matrix import PortDistanceMatrix
+from utils.harvesine import haversine
+
+
+@pytest.fixture
+def matrix():
+    return PortDistanceMatrix(ports_data)
+
+
+def test_nearest_is_sorted_and_excludes_the_port(matrix):
+    port = ports_data[0]
+    nearest = matrix.nearest(port["name"])
+    assert len(nearest) == len(ports_data) - 1
+    assert all(other["name"] != port["name"] for other, _ in nearest)
+    distances = [distance for _, distance in nearest]
+    assert distances == sorted(distances)
+    for other, distance in nearest:
+        expected = haversine(
+            port["latitude"], port["longitude"], other["latitude"], other["longitude"]
+        )
+        assert distance == pytest.approx(expected, rel=1e-5)
+
+
+def test_nearest_limit(matrix):
+    name = ports_data[0]["name"]
+    assert matrix.nearest(name, limit=0) == []
+    assert matrix.nearest(name, limit=3) == matrix.nearest(name)[:3]
+    with pytest.raises(ValueError):
+        matrix.nearest(name, limit=-1)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from utils.harvesine import haversine, haversine_many, haversine_matrix
+
+# Puerto Ayora, Puerto Baquerizo Moreno, Puerto Villamil, Puerto Velasco Ibarra
+LATS = [-0.7433, -0.9016, -0.9563, -1.2754]
+LONS = [-90.3131, -89.6097, -90.9647, -90.4862]
+
+
+def _expected(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(lat1, lon1, lat2, lon2)
+    flat = [
+        haversine(*point)
+        for point in zip(lat1.ravel(), lon1.ravel(), lat2.ravel(), lon2.ravel())
+    ]
+    return np.array(flat).reshape(lat1.shape)
+
+
+def test_scalars():
+    distance = haversine_many(LATS[0], LONS[0], LATS[1], LONS[1])
+    assert np.ndim(distance) == 0
+    assert distance == pytest.approx(haversine(LATS[0], LONS[0], LATS[1], LONS[1]))
+    assert haversine_many(0, 0, 1, 1) == pytest.approx(haversine(0, 0, 1, 1))
+
+
+@pytest.mark.parametrize(
+    "lat1, lon1, lat2, lon2",
+    [
+        # One point against many
+        (LATS[0], LONS[0], LATS, LONS),
+        # Scalar latitudes, longitudes varying
+        (LATS[0], LONS, LATS[1], LONS[::-1]),
+        (0.0, LONS[0], 0.0, LONS),
+        # Column latitudes against row longitudes
+        (np.array(LATS)[:, None], LONS[0], LATS[1], np.array(LONS)[None, :]),
+        (np.array(LATS)[:, None], np.array(LONS)[:, None], 0.0, np.array(LONS)),
+    ],
+)
+def test_broadcasting(lat1, lon1, lat2, lon2):
+    distances = haversine_many(lat1, lon1, lat2, lon2)
+    expected = _expected(lat1, lon1, lat2, lon2)
+    assert distances.shape == expected.shape
+    np.testing.assert_allclose(distances, expected, rtol=1e-9)
+
+
+def test_out_and_float32():
+    out = np.empty(len(LATS), dtype=np.float32)
+    result = haversine_many(LATS[0], LONS[0], LATS, LONS, dtype=np.float32, out=out)
+    assert result is out
+    np.testing.assert_allclose(out, _expected(LATS[0], LONS[0], LATS, LONS), rtol=1e-4)
+
+
+def test_antipodal_points():
+    assert haversine_many(0, 0, 0, 180) == pytest.approx(np.pi * 6371)
+
+
+def test_matrix():
+    matrix = haversine_matrix(LATS, LONS, LATS[:2], LONS[:2])
+    expected = _expected(
+        np.array(LATS)[:, None], np.array(LONS)[:, None], LATS[:2], LONS[:2]
+    )
+    assert matrix.shape == (len(LATS), 2)
+    np.testing.assert_allclose(matrix, expected, rtol=1e-9)
+    np.testing.assert_allclose(np.diag(matrix), 0, atol=1e-9)
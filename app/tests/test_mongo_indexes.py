@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.Mongo.indexes import (
+    INDEXED_QUERIES,
+    INDEXES,
+    ensure_indexes,
+    explain_indexed_queries,
+)
+
+
+@pytest.fixture
+def indexed_db(mongo_db):
+    ensure_indexes()
+    start = datetime(2024, 1, 1)
+    mongo_db.orders.insert_many(
+        {
+            "client_id": i % 5,
+            "warehouse_id": i % 3,
+            "status": ["pending", "shipped", "delivered"][i % 3],
+            "created_at": start + timedelta(minutes=i),
+        }
+        for i in range(200)
+    )
+    mongo_db.equipment.insert_many(
+        {"id": i, "name": f"Equipment {i}"} for i in range(50)
+    )
+    return mongo_db
+
+
+def test_ensure_indexes_is_idempotent(indexed_db):
+    ensure_indexes()
+    for collection, models in INDEXES.items():
+        names = set(indexed_db[collection].index_information())
+        assert {model.document["name"] for model in models} <= names
+
+
+def test_queries_use_indexes(indexed_db):
+    plans = explain_indexed_queries()
+    assert len(plans) == len(INDEXED_QUERIES)
+    for plan in plans:
+        assert "IXSCAN" in plan["stages"], plan
+        assert "COLLSCAN" not in plan["stages"], plan
+        assert "SORT" not in plan["stages"], plan
+        assert plan["indexed"]
@@ -0,0 +1,65 @@
+import pytest
+
+from models.Neo4j.ports import deduplicate_port_distances
+
+PORTS = ["Test Port A", "Test Port B", "Test Port C"]
+
+
+def _run(driver, query, **params):
+    with driver.session() as session:
+        return session.run(query, **params)
+
+
+def _links(driver):
+    result = _run(
+        driver,
+        """
+        MATCH (p1:Port)-[d:DISTANCE_TO]->(p2:Port)
+        WHERE p1.name IN $names AND p2.name IN $names
+        RETURN p1.name AS name1, p2.name AS name2
+        """,
+        names=PORTS,
+    )
+    return sorted(tuple(sorted((r["name1"], r["name2"]))) for r in result)
+
+
+@pytest.fixture
+def ports(neo4j_driver):
+    _run(neo4j_driver, "UNWIND $names AS name CREATE (:Port {name: name})", names=PORTS)
+    yield PORTS
+    _run(
+        neo4j_driver,
+        "MATCH (p:Port) WHERE p.name IN $names DETACH DELETE p",
+        names=PORTS,
+    )
+
+
+def test_deduplicate_keeps_one_link_per_pair(neo4j_driver, ports):
+    a, b, c = ports
+    # Legacy directed copies for A-B and B-C, a single link for A-C
+    _run(
+        neo4j_driver,
+        """
+        UNWIND $links AS link
+        MATCH (p1:Port {name: link[0]}), (p2:Port {name: link[1]})
+        CREATE (p1)-[:DISTANCE_TO {distance_km: 1.0}]->(p2)
+        """,
+        links=[[a, b], [b, a], [b, c], [c, b], [c, b], [a, c]],
+    )
+
+    assert deduplicate_port_distances(batch_size=1) >= 3
+    assert _links(neo4j_driver) == [(a, b), (a, c), (b, c)]
+
+    # The undirected MERGE then updates the remaining link in place
+    _run(
+        neo4j_driver,
+        """
+        MATCH (p1:Port {name: $name1}), (p2:Port {name: $name2})
+        MERGE (p1)-[d:DISTANCE_TO]-(p2)
+        SET d.distance_km = 2.0
+        """,
+        name1=b,
+        name2=a,
+    )
+    assert _links(neo4j_driver) == [(a, b), (a, c), (b, c)]
+    assert deduplicate_port_distances() == 0
@@ -0,0 +1,150 @@
+import heapq
+import math
+import random
+
+import pytest
+
+from data.ports import ports_data
+from services.routing_service import _straight_line_heuristic
+from utils.distance_matrix import PortDistanceMatrix, sparse_edges
+from utils.routing import FuelRouteEngine, RouteEngine
+
+
+def dijkstra(adjacency, start, end):
+    """Plain Dijkstra, the reference the engines are checked against."""
+    if start not in adjacency or end not in adjacency:
+        return None
+    distances = {start: 0.0}
+    previous = {}
+    frontier = [(0.0, start)]
+    while frontier:
+        distance, node = heapq.heappop(frontier)
+        if distance > distances[node]:
+            continue
+        if node == end:
+            path = [end]
+            while path[-1] != start:
+                path.append(previous[path[-1]])
+            return path[::-1], distance
+        for neighbour, weight in adjacency[node]:
+            candidate = distance + weight
+            if candidate < distances.get(neighbour, math.inf):
+                distances[neighbour] = candidate
+                previous[neighbour] = node
+                heapq.heappush(frontier, (candidate, neighbour))
+    return None
+
+
+def path_length(adjacency, path):
+    total = 0.0
+    for node, neighbour in zip(path, path[1:]):
+        total += min(w for n, w in adjacency[node] if n == neighbour)
+    return total
+
+
+def assert_same_route(adjacency, route, expected, exact_path=True):
+    if expected is None:
+        assert route is None
+        return
+    path, distance = route
+    assert distance == pytest.approx(expected[1])
+    assert path[0] == expected[0][0] and path[-1] == expected[0][-1]
+    assert path_length(adjacency, path) == pytest.approx(distance)
+    if exact_path:
+        assert path == expected[0]
+
+
+def galapagos_graph(k=None):
+    # Weights rounded to 10 m, as stored on DISTANCE_TO relationships
+    matrix = PortDistanceMatrix(ports_data)
+    names = [port["name"] for port in matrix.ports]
+    if k is None:
+        pairs = [(i, j) for i in range(len(names)) for j in range(i + 1, len(names))]
+    else:
+        pairs = sparse_edges(matrix.distances, k=k)
+    adjacency = {name: [] for name in names}
+    for i, j in pairs:
+        weight = round(float(matrix.distances[i, j]), 2)
+        adjacency[names[i]].append((names[j], weight))
+        adjacency[names[j]].append((names[i], weight))
+    return adjacency, matrix
+
+
+def random_graph(seed, nodes=40, edges=80, components=2):
+    # Points on a plane, edges at least as long as the straight line, so
+    # the euclidean distance is an admissible heuristic. Nodes are split in
+    # components that are not linked to each other.
+    rng = random.Random(seed)
+    points = {node: (rng.uniform(0, 100), rng.uniform(0, 100)) for node in range(nodes)}
+    adjacency = {node: [] for node in points}
+    for _ in range(edges):
+        a, b = rng.sample(range(nodes), 2)
+        if a % components != b % components:
+            continue
+        weight = math.dist(points[a], points[b]) * rng.uniform(1, 1.5)
+        adjacency[a].append((b, weight))
+        adjacency[b].append((a, weight))
+
+    def heuristic(node, end):
+        return math.dist(points[node], points[end])
+
+    return adjacency, heuristic
+
+
+@pytest.mark.parametrize("k", [None, 2, 4])
+def test_galapagos_routes_match_dijkstra(k):
+    adjacency, matrix = galapagos_graph(k)
+    engine = RouteEngine(adjacency, _straight_line_heuristic(matrix))
+    for start in adjacency:
+        for end in adjacency:
+            expected = dijkstra(adjacency, start, end)
+            route = engine.shortest_path(start, end)
+            # Rounded weights can tie, only the distance is unique
+            assert_same_route(adjacency, route, expected, exact_path=False)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_random_routes_match_dijkstra(seed):
+    adjacency, heuristic = random_graph(seed)
+    engines = [RouteEngine(adjacency, heuristic), RouteEngine(adjacency)]
+    for start in adjacency:
+        for end in adjacency:
+            expected = dijkstra(adjacency, start, end)
+            for engine in engines:
+                assert_same_route(adjacency, engine.shortest_path(start, end), expected)
+
+
+def test_unreachable_and_unknown_nodes():
+    adjacency, heuristic = random_graph(0)
+    engine = RouteEngine(adjacency, heuristic)
+    # Even and odd nodes are in different components
+    assert engine.shortest_path(0, 1) is None
+    assert engine.shortest_path(0, "nowhere") is None
+    assert engine.shortest_path("nowhere", 0) is None
+
+
+def test_start_is_end():
+    adjacency, matrix = galapagos_graph(2)
+    engine = RouteEngine(adjacency, _straight_line_heuristic(matrix))
+    for node in adjacency:
+        assert engine.shortest_path(node, node) == ([node], 0.0)
+
+
+def test_routes_are_cached():
+    adjacency, heuristic = random_graph(1)
+    engine = RouteEngine(adjacency, heuristic, cache_size=1)
+    engine.shortest_path(0, 2)
+    engine.shortest_path(0, 2)
+    engine.shortest_path(0, 4)
+    assert engine.stats()["hits"] == 1
+    assert engine.stats()["size"] == 1
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_fuel_routes_without_fuel_limit_match_dijkstra(seed):
+    adjacency, heuristic = random_graph(seed)
+    engine = FuelRouteEngine(adjacency, 1e9, 1.0, heuristic)
+    for start in adjacency:
+        for end in adjacency:
+            expected = dijkstra(adjacency, start, end)
+            assert_same_route(adjacency, engine.shortest_path(start, end), expected)
@@ -0,0 +1,59 @@
+import pytest
+
+from models.Neo4j.clients import upsert_clients
+
+PORTS = ["Test Port A", "Test Port B"]
+CLIENT_ID = -1
+
+
+def _run(driver, query, **params):
+    with driver.session() as session:
+        return session.run(query, **params)
+
+
+@pytest.fixture
+def lockers(neo4j_driver):
+    _run(
+        neo4j_driver,
+        """
+        UNWIND range(0, size($names) - 1) AS i
+        CREATE (:Locker {id: -1 - i})-[:LOCATED_AT]->(:Port {name: $names[i]})
+        """,
+        names=PORTS,
+    )
+    yield PORTS
+    _run(
+        neo4j_driver,
+        """
+        MATCH (n)
+        WHERE (n:Port AND n.name IN $names) OR (n:Locker AND n.id < 0)
+            OR (n:Client AND n.id = $client_id)
+        DETACH DELETE n
+        """,
+        names=PORTS,
+        client_id=CLIENT_ID,
+    )
+
+
+def _client_lockers(driver):
+    result = _run(
+        driver,
+        """
+        MATCH (:Client {id: $id})-[:ASSIGNED_TO]->(:Locker)-[:LOCATED_AT]->(p:Port)
+        RETURN p.name AS port
+        """,
+        id=CLIENT_ID,
+    )
+    return [record["port"] for record in result]
+
+
+def test_upsert_moves_client_to_its_new_locker(neo4j_driver, lockers):
+    client = {"id": CLIENT_ID, "name": "Test Client", "specialty": "Testing"}
+
+    assert upsert_clients([{**client, "locker": PORTS[0]}]) == 1
+    assert _client_lockers(neo4j_driver) == [PORTS[0]]
+    assert upsert_clients([{**client, "locker": PORTS[0]}]) == 0
+
+    # A relationship change alone is a change, and replaces the old link
+    assert upsert_clients([{**client, "locker": PORTS[1]}]) == 1
+    assert _client_lockers(neo4j_driver) == [PORTS[1]]
@@ -0,0 +1,96 @@
+import numpy as np
+
+
+def _shortest_augmenting_paths(cost):
+    # Jonker-Volgenant style solver for n <= m, see Crouse, "On implementing
+    # 2D rectangular assignment algorithms" (2016). Every step over the
+    # columns is vectorized, rows are augmented one at a time.
+    n, m = cost.shape
+    u = np.zeros(n)
+    v = np.zeros(m)
+    col4row = np.full(n, -1)
+    row4col = np.full(m, -1)
+
+    for current in range(n):
+        shortest = np.full(m, np.inf)
+        path = np.full(m, -1)
+        remaining = np.ones(m, dtype=bool)
+        scanned_rows = []
+        min_value = 0.0
+        row = current
+        sink = -1
+        while sink == -1:
+            scanned_rows.append(row)
+            reduced = min_value + cost[row] - u[row] - v
+            better = remaining & (reduced < shortest)
+            path[better] = row
+            shortest[better] = reduced[better]
+
+            candidates = np.where(remaining, shortest, np.inf)
+            min_value = candidates.min()
+            ties = np.flatnonzero(candidates == min_value)
+            # Prefer a free column, which ends the search
+            free = ties[row4col[ties] == -1]
+            column = free[0] if len(free) else ties[0]
+            remaining[column] = False
+            if row4col[column] == -1:
+                sink = column
+            else:
+                row = row4col[column]
+
+        u[current] += min_value
+        others = np.array(scanned_rows[1:], dtype=np.intp)
+        u[others] += min_value - shortest[col4row[others]]
+        scanned = ~remaining
+        v[scanned] -= min_value - shortest[scanned]
+
+        column = sink
+        while True:
+            row = path[column]
+            row4col[column] = row
+            col4row[row], column = column, col4row[row]
+            if row == current:
+                break
+    return col4row
+
+
+def min_cost_assignment(cost):
+    """Solve a rectangular min-cost assignment problem.
+
+    cost is a (rows, columns) matrix where np.inf forbids a pair. Returns
+    the (row, column) pairs of an assignment of minimal total cost among
+    those matching as many rows (or columns) as possible.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    allowed = np.isfinite(cost)
+    if n == 0 or not allowed.any():
+        return []
+
+    # An optimal assignment only uses the n cheapest columns of each row:
+    # any other column could be swapped for a free one among them.
+    if m > n:
+        keep = np.argpartition(np.where(allowed, cost, np.inf), n - 1, axis=1)
+        columns = np.unique(keep[:, :n])
+        columns = columns[allowed[:, columns].any(axis=0)]
+    else:
+        columns = np.arange(m)
+
+    # Forbidden pairs cost more than any assignment of allowed pairs, plus
+    # one dummy column per row lets rows stay unassigned at that cost.
+    reduced = cost[:, columns]
+    finite = reduced[np.isfinite(reduced)]
+    forbidden = (np.abs(finite).sum() + 1) * 2
+    reduced = np.where(np.isfinite(reduced), reduced, forbidden)
+    dummies = np.full((n, n), forbidden)
+    col4row = _shortest_augmenting_paths(np.hstack([reduced, dummies]))
+
+    pairs = []
+    for row, column in enumerate(col4row.tolist()):
+        if column < len(columns) and reduced[row, column] < forbidden:
+            pair = (row, int(columns[column]))
+            pairs.append(pair[::-1] if transposed else pair)
+    return sorted(pairs)
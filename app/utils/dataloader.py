@@ -0,0 +1,61 @@
+def field_level(path):
+    # Response path without list indices: every item of a list shares a level
+    return tuple(key for key in path.as_list() if isinstance(key, str))
+
+
+class SiblingRegistry:
+    """Objects resolved so far in a request, grouped by execution level.
+
+    Execution is depth-first, so when a nested field is resolved for the first
+    parent of a list, the registry already holds the other parents of that
+    level and a loader can fetch the field for all of them at once.
+    """
+
+    def __init__(self):
+        self._levels = {}
+
+    def add(self, path, value):
+        level = self._levels.setdefault(field_level(path), [])
+        if isinstance(value, dict):
+            level.append(value)
+        elif isinstance(value, list):
+            level.extend(item for item in value if isinstance(item, dict))
+
+    def extend(self, level, values):
+        # Register objects ahead of their resolution, e.g. connection nodes
+        self._levels.setdefault(level, []).extend(values)
+
+    def get(self, path):
+        return self._levels.get(field_level(path), [])
+
+
+class DataLoader:
+    """Per-request batching and caching loader for a nested field.
+
+    batch_fn takes a list of keys and returns a dict mapping each key to its
+    value; keys missing from that dict resolve to default. key_attr names
+    the parent attribute holding the key, used to collect the sibling keys.
+    """
+
+    def __init__(self, registry, batch_fn, key_attr, default=None):
+        self.registry = registry
+        self.batch_fn = batch_fn
+        self.key_attr = key_attr
+        self.default = default
+        self._cache = {}
+
+    def load(self, info, key):
+        if key not in self._cache:
+            keys = {key}
+            for parent in self.registry.get(info.path.prev):
+                sibling_key = parent.get(self.key_attr)
+                if sibling_key is not None and sibling_key not in self._cache:
+                    keys.add(sibling_key)
+
+            values = self.batch_fn(list(keys))
+            for batch_key in keys:
+                value = values.get(batch_key, self.default)
+                self._cache[batch_key] = value
+                self.registry.add(info.path, value)
+
+        return self._cache[key]
@@ -0,0 +1,187 @@
+import threading
+
+import numpy as np
+
+from utils.harvesine import haversine_many, haversine_matrix
+from utils.spatial_index import SphereKDTree
+
+
+class PortDistanceMatrix:
+    """Great-circle distances between every pair of ports, kept in memory.
+
+    Distances are stored in a float32 matrix indexed through a name-to-index
+    map. Adding, moving or removing a port only touches its row and column; storage
+    grows by doubling so repeated additions stay amortized O(n). Nearest
+    port lookups go through a KD-tree, rebuilt lazily after a change.
+    """
+
+    def __init__(self, ports=()):
+        self.ports = []
+        self.index = {}
+        self._coordinates = np.empty((0, 2))
+        self._distances = np.empty((0, 0), dtype=np.float32)
+        self._tree = None
+        self._lock = threading.RLock()
+
+        ports = list(ports)
+        if ports:
+            self._reserve(len(ports))
+            n = len(ports)
+            coordinates = self._coordinates[:n]
+            coordinates[:] = [[port["latitude"], port["longitude"]] for port in ports]
+            lat, lon = coordinates[:, 0], coordinates[:, 1]
+            haversine_matrix(lat, lon, lat, lon, out=self._distances[:n, :n])
+            self.ports = [dict(port) for port in ports]
+            self.index = {port["name"]: i for i, port in enumerate(ports)}
+
+    def __len__(self):
+        return len(self.ports)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    @property
+    def distances(self):
+        """Square matrix of distances in km, in the order of self.ports."""
+        n = len(self.ports)
+        return self._distances[:n, :n]
+
+    def _reserve(self, size):
+        capacity = len(self._coordinates)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+        n = len(self.ports)
+
+        coordinates = np.empty((capacity, 2))
+        coordinates[:n] = self._coordinates[:n]
+        distances = np.zeros((capacity, capacity), dtype=np.float32)
+        distances[:n, :n] = self._distances[:n, :n]
+        self._coordinates = coordinates
+        self._distances = distances
+
+    def upsert(self, port):
+        """Add a port, or move it if a port with the same name exists."""
+        with self._lock:
+            i = self.index.get(port["name"])
+            if i is None:
+                i = len(self.ports)
+                self._reserve(i + 1)
+                self.ports.append(dict(port))
+                self.index[port["name"]] = i
+            else:
+                self.ports[i] = dict(port)
+
+            n = len(self.ports)
+            lat, lon = port["latitude"], port["longitude"]
+            self._coordinates[i] = (lat, lon)
+            row = self._distances[i, :n]
+            haversine_many(
+                lat, lon, self._coordinates[:n, 0], self._coordinates[:n, 1], out=row
+            )
+            row[i] = 0
+            self._distances[:n, i] = row
+            self._tree = None
+
+    def remove(self, name):
+        """Remove a port; the last port takes its index. Returns False if absent."""
+        with self._lock:
+            i = self.index.pop(name, None)
+            if i is None:
+                return False
+            last = len(self.ports) - 1
+            if i != last:
+                moved = self.ports[last]
+                self.ports[i] = moved
+                self.index[moved["name"]] = i
+                self._coordinates[i] = self._coordinates[last]
+                self._distances[i, :] = self._distances[last, :]
+                self._distances[:, i] = self._distances[:, last]
+                self._distances[i, i] = 0
+            self.ports.pop()
+            self._distances[last, :] = 0
+            self._distances[:, last] = 0
+            self._tree = None
+            return True
+
+    def distance(self, name1, name2):
+        with self._lock:
+            return float(self._distances[self.index[name1], self.index[name2]])
+
+    def row(self, name):
+        """Distances from a port to every port, in the order of self.ports."""
+        with self._lock:
+            return self._distances[self.index[name], : len(self.ports)].copy()
+
+    def nearest(self, name, limit=None, max_distance_km=None):
+        """Return (port, distance_km) pairs for the other ports, closest first.
+
+        limit bounds the number of ports returned, max_distance_km their
+        distance.
+        """
+        if limit is not None and limit < 0:
+            raise ValueError("limit must be a positive number")
+        with self._lock:
+            n = len(self.ports)
+            if self._tree is None:
+                self._tree = SphereKDTree(
+                    self._coordinates[:n, 0], self._coordinates[:n, 1]
+                )
+            i = self.index[name]
+            latitude, longitude = self._coordinates[i]
+            # The port itself is its own closest match
+            k = None if limit is None else limit + 1
+            matches = self._tree.query(latitude, longitude, k, max_distance_km)
+            nearest = [
+                (self.ports[j], float(self._distances[i, j]))
+                for j, _ in matches
+                if j != i
+            ]
+            return nearest if limit is None else nearest[:limit]
+
+
+def minimum_spanning_tree(distances):
+    """Return the (i, j) edges of a minimum spanning tree (Prim, O(n²))."""
+    n = len(distances)
+    if n < 2:
+        return []
+    in_tree = np.zeros(n, dtype=bool)
+    in_tree[0] = True
+    best = distances[0].astype(np.float64)
+    parent = np.zeros(n, dtype=np.intp)
+
+    edges = []
+    for _ in range(n - 1):
+        j = int(np.argmin(np.where(in_tree, np.inf, best)))
+        edges.append((int(parent[j]), j))
+        in_tree[j] = True
+        closer = distances[j] < best
+        best[closer] = distances[j][closer]
+        parent[closer] = j
+    return edges
+
+
+def sparse_edges(distances, k=None, radius_km=None):
+    """Return the (i, j) pairs, i < j, of a sparse graph over a distance matrix.
+
+    Each point is linked to its k nearest neighbours and/or to every point
+    within radius_km. The edges of a minimum spanning tree are always added,
+    so the graph is connected whatever k and radius_km are.
+    """
+    n = len(distances)
+    links = np.zeros((n, n), dtype=bool)
+
+    if k and n > 1:
+        k = min(k, n - 1)
+        candidates = distances.astype(np.float64)
+        np.fill_diagonal(candidates, np.inf)
+        nearest = np.argpartition(candidates, k - 1, axis=1)[:, :k]
+        links[np.arange(n)[:, None], nearest] = True
+    if radius_km:
+        links |= distances <= radius_km
+
+    for i, j in minimum_spanning_tree(distances):
+        links[i, j] = True
+    links |= links.T
+    rows, cols = np.nonzero(np.triu(links, 1))
+    return list(zip(rows.tolist(), cols.tolist()))
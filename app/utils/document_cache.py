@@ -0,0 +1,89 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from graphql import parse, validate
+
+
+class _Entry:
+    def __init__(self, document):
+        self.document = document
+        # Validation errors per set of validation rules
+        self.validations = {}
+
+
+class DocumentCache:
+    """Bounded LRU cache of parsed and validated GraphQL documents.
+
+    Plugs into graphql_sync through its query_parser and query_validator
+    options. Documents are keyed by the sha256 of the query text, and the
+    validation result of a cached document is reused as long as the same
+    rules are requested.
+    """
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._keys_by_document = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def hash_query(query):
+        return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+    def parse(self, context_value, data):
+        key = self.hash_query(data["query"])
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.document
+            self.misses += 1
+
+        document = parse(data["query"])
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = _Entry(document)
+                self._keys_by_document[id(document)] = key
+                self._evict()
+            return self._entries[key].document
+
+    def validate(self, schema, document, rules=None, max_errors=None, **kwargs):
+        rules_key = (id(schema), tuple(rules or ()), max_errors)
+        with self._lock:
+            key = self._keys_by_document.get(id(document))
+            entry = self._entries.get(key) if key else None
+            if entry is not None and rules_key in entry.validations:
+                return entry.validations[rules_key]
+
+        errors = validate(
+            schema, document, rules=rules, max_errors=max_errors, **kwargs
+        )
+        if entry is not None:
+            with self._lock:
+                entry.validations[rules_key] = errors
+        return errors
+
+    def _evict(self):
+        while len(self._entries) > self.max_size:
+            _, entry = self._entries.popitem(last=False)
+            self._keys_by_document.pop(id(entry.document), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_document.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
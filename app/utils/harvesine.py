@@ -1,5 +1,9 @@
 import math
 
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
 
 def haversine(lat1, lon1, lat2, lon2):
     R = 6371  # rayon de la Terre en km
@@ -15,3 +19,43 @@ def haversine(lat1, lon1, lat2, lon2):
     )
     c = 2 * math.asin(math.sqrt(a))
     return R * c
+
+
+def haversine_many(lat1, lon1, lat2, lon2, dtype=np.float64, out=None):
+    """Vectorized haversine distances in km between points given in degrees.
+
+    Arguments are scalars or arrays broadcast against each other, so one
+    point can be measured against many. Computations are made in dtype
+    (float32 or float64); the result is written to out when given, which
+    must have the broadcast shape and dtype.
+    """
+    lat1 = np.radians(np.asarray(lat1, dtype=dtype))
+    lon1 = np.radians(np.asarray(lon1, dtype=dtype))
+    lat2 = np.radians(np.asarray(lat2, dtype=dtype))
+    lon2 = np.radians(np.asarray(lon2, dtype=dtype))
+
+    # Summed out of place so a has the full broadcast shape, and made a
+    # 0-d array rather than a NumPy scalar when every argument is a scalar,
+    # so the in-place operations below work
+    a = np.asarray(
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    # Rounding can push antipodal points slightly over 1
+    np.minimum(a, 1, out=a)
+    np.sqrt(a, out=a)
+    np.arcsin(a, out=a)
+    return np.multiply(a, 2 * EARTH_RADIUS_KM, out=out, dtype=dtype)
+
+
+def haversine_matrix(lats1, lons1, lats2, lons2, dtype=np.float64, out=None):
+    """Distances in km from every point of a set to every point of another.
+
+    Returns a (len(lats1), len(lats2)) matrix, e.g. every seaplane to every
+    warehouse port.
+    """
+    lats1 = np.asarray(lats1, dtype=dtype)[:, None]
+    lons1 = np.asarray(lons1, dtype=dtype)[:, None]
+    lats2 = np.asarray(lats2, dtype=dtype)[None, :]
+    lons2 = np.asarray(lons2, dtype=dtype)[None, :]
+    return haversine_many(lats1, lons1, lats2, lons2, dtype=dtype, out=out)
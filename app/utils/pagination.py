@@ -0,0 +1,89 @@
+import base64
+import json
+import re
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(values):
+    encoded = json.dumps(values, default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(encoded).decode("ascii")
+
+
+_OBJECT_ID = re.compile(r"[0-9a-fA-F]{24}")
+
+
+def cursor_string(value):
+    if not isinstance(value, str):
+        raise TypeError(f"{value!r} is not a string")
+    return value
+
+
+def cursor_integer(value):
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise TypeError(f"{value!r} is not an integer")
+    return value
+
+
+def cursor_datetime(value):
+    return datetime.fromisoformat(cursor_string(value))
+
+
+def cursor_object_id(value):
+    if not _OBJECT_ID.fullmatch(cursor_string(value)):
+        raise ValueError(f"{value!r} is not an ObjectId")
+    return value
+
+
+def decode_cursor(cursor, parsers):
+    """Decode a cursor into its keyset values, one per parser.
+
+    Each parser converts its value and raises ValueError or TypeError when
+    the value has the wrong type; any such cursor is reported as invalid.
+    """
+    if cursor is None:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError(f"expected {len(parsers)} values")
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor '{cursor}'") from e
+
+
+def page_size(first):
+    if first is None:
+        return DEFAULT_PAGE_SIZE
+    if first < 0:
+        raise ValueError("first must be a positive number")
+    return min(first, MAX_PAGE_SIZE)
+
+
+def build_connection(items, first, after, cursor_values, count):
+    """Build a Relay connection from a page fetched with first + 1 items.
+
+    cursor_values returns the keyset values of an item, count is called only
+    when totalCount is requested.
+    """
+    has_next_page = len(items) > first
+    items = items[:first]
+    edges = [
+        {"node": item, "cursor": encode_cursor(cursor_values(item))} for item in items
+    ]
+    return {
+        "edges": edges,
+        "pageInfo": {
+            "hasNextPage": has_next_page,
+            "hasPreviousPage": after is not None,
+            "startCursor": edges[0]["cursor"] if edges else None,
+            "endCursor": edges[-1]["cursor"] if edges else None,
+        },
+        "_count": count,
+    }
+
+
+def resolve_total_count(obj, info):
+    return obj["_count"]()
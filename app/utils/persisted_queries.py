@@ -0,0 +1,82 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class PersistedQueryError(Exception):
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+
+class PersistedQueryRegistry:
+    """Automatic persisted queries (APQ) registry shared by a worker.
+
+    Clients send extensions.persistedQuery.sha256Hash instead of the query
+    text. An unknown hash is answered with PersistedQueryNotFound, after which
+    the client sends the hash together with the query once to register it.
+    """
+
+    def __init__(self, max_size=1000):
+        self.max_size = max_size
+        self._queries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, data):
+        """Return the request data with its query text filled in.
+
+        Data that is not a JSON object is returned unchanged for the GraphQL
+        server to reject.
+        """
+        if not isinstance(data, dict):
+            return data
+        extensions = data.get("extensions") or {}
+        if not isinstance(extensions, dict):
+            raise PersistedQueryError(
+                "extensions must be a JSON object", "BAD_USER_INPUT"
+            )
+        persisted = extensions.get("persistedQuery")
+        if not persisted:
+            return data
+        if not isinstance(persisted, dict):
+            raise PersistedQueryError(
+                "extensions.persistedQuery must be a JSON object", "BAD_USER_INPUT"
+            )
+
+        if persisted.get("version") != 1:
+            raise PersistedQueryError(
+                "Unsupported persisted query version", "PERSISTED_QUERY_NOT_SUPPORTED"
+            )
+        query_hash = persisted.get("sha256Hash")
+        query = data.get("query")
+        if query is not None and not isinstance(query, str):
+            raise PersistedQueryError("query must be a string", "BAD_USER_INPUT")
+
+        if query:
+            if hashlib.sha256(query.encode("utf-8")).hexdigest() != query_hash:
+                raise PersistedQueryError(
+                    "provided sha does not match query", "INTERNAL_SERVER_ERROR"
+                )
+            self._register(query_hash, query)
+            return data
+
+        with self._lock:
+            query = self._queries.get(query_hash)
+            if query is not None:
+                self._queries.move_to_end(query_hash)
+        if query is None:
+            raise PersistedQueryError(
+                "PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND"
+            )
+        return {**data, "query": query}
+
+    def _register(self, query_hash, query):
+        with self._lock:
+            self._queries[query_hash] = query
+            self._queries.move_to_end(query_hash)
+            while len(self._queries) > self.max_size:
+                self._queries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._queries), "max_size": self.max_size}
@@ -0,0 +1,204 @@
+import os
+
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLList,
+    GraphQLNonNull,
+    GraphQLObjectType,
+    InlineFragmentNode,
+    get_named_type,
+    get_operation_ast,
+    value_from_ast,
+)
+
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+# Cost of resolving a field once. Fields with their own resolver cost one
+# database round-trip by default, plain properties are free.
+FIELD_COSTS = {
+    "Query.shortestPathBetweenPorts": 10,
+    "Query.routeForSeaplane": 10,
+    "Query.deliveryPlan": 50,
+    "Query.orderAssignments": 50,
+    "Query.tripEstimates": 10,
+}
+
+# Expected number of items returned by list fields, used as multiplier of
+# the cost of their selection. Arguments such as limit or first override it,
+# on a connection field they size the edges list of its selection.
+LIST_SIZES = {
+    "Query.orders": 100,
+    "Query.ordersByStatus": 50,
+    "Query.ordersByClient": 20,
+    "Query.ordersByWarehouse": 50,
+    "Query.ports": 30,
+    "Query.seaplanes": 20,
+    "Query.clients": 50,
+    "DeliveryPlan.tours": 20,
+    "DeliveryPlan.unassigned_orders": 100,
+    "DeliveryTour.orders": 20,
+    "OrderAssignmentPlan.assignments": 20,
+    "OrderAssignmentPlan.unassigned_orders": 100,
+    "OrderAssignmentPlan.idle_seaplanes": 20,
+    "TripEstimates.seaplanes": 20,
+    "TripEstimates.models": 5,
+    "Island.ports": 5,
+    "Locker.clients": 10,
+    "Manufacturer.models": 3,
+    "SeaplaneModel.seaplanes": 5,
+}
+
+LIMIT_ARGUMENTS = ("first", "limit")
+
+
+class QueryCostError(Exception):
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+
+def get_limits():
+    return {
+        "max_cost": int(os.getenv("GRAPHQL_MAX_COST", "2000")),
+        "max_depth": int(os.getenv("GRAPHQL_MAX_DEPTH", "8")),
+        "default_list_size": int(os.getenv("GRAPHQL_DEFAULT_LIST_SIZE", "10")),
+    }
+
+
+def _is_list(graphql_type):
+    if isinstance(graphql_type, GraphQLNonNull):
+        graphql_type = graphql_type.of_type
+    return isinstance(graphql_type, GraphQLList)
+
+
+class _Analyzer:
+    def __init__(self, schema, fragments, variables, default_list_size):
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables or {}
+        self.default_list_size = default_list_size
+
+    def fields(self, selection_set, visited=()):
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                yield selection
+            elif isinstance(selection, InlineFragmentNode):
+                yield from self.fields(selection.selection_set, visited)
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                if name in visited or name not in self.fragments:
+                    continue
+                fragment = self.fragments[name]
+                yield from self.fields(fragment.selection_set, visited + (name,))
+
+    def limit(self, field, node):
+        for argument in node.arguments or ():
+            # Unknown arguments are reported by validation
+            if (
+                argument.name.value in LIMIT_ARGUMENTS
+                and argument.name.value in field.args
+            ):
+                arg_type = field.args[argument.name.value].type
+                value = value_from_ast(argument.value, arg_type, self.variables)
+                # Negative sizes would lower the estimate of the whole query
+                if isinstance(value, int):
+                    return max(0, value)
+        return None
+
+    def list_size(self, coordinate, field, node, page_size=None):
+        limit = self.limit(field, node)
+        if limit is not None:
+            return limit
+        if page_size is not None:
+            return page_size
+        return LIST_SIZES.get(coordinate, self.default_list_size)
+
+    def connection_size(self, field, node):
+        # Connections default to the page size used by their resolvers
+        if not any(name in field.args for name in LIMIT_ARGUMENTS):
+            return None
+        limit = self.limit(field, node)
+        return DEFAULT_PAGE_SIZE if limit is None else min(limit, MAX_PAGE_SIZE)
+
+    def selection(self, parent_type, selection_set, page_size=None):
+        """Return the (cost, depth) of a selection set.
+
+        page_size is the first argument of the connection owning the selection.
+        """
+        cost = 0
+        depth = 0
+        for node in self.fields(selection_set):
+            name = node.name.value
+            # Introspection is served from the schema, without resolvers
+            if name.startswith("__") or name not in parent_type.fields:
+                continue
+
+            field = parent_type.fields[name]
+            coordinate = f"{parent_type.name}.{name}"
+            field_cost = FIELD_COSTS.get(coordinate, 1 if field.resolve else 0)
+            field_depth = 1
+
+            field_type = get_named_type(field.type)
+            if node.selection_set and isinstance(field_type, GraphQLObjectType):
+                if _is_list(field.type):
+                    child_cost, child_depth = self.selection(
+                        field_type, node.selection_set
+                    )
+                    child_cost *= self.list_size(coordinate, field, node, page_size)
+                else:
+                    child_cost, child_depth = self.selection(
+                        field_type,
+                        node.selection_set,
+                        self.connection_size(field, node),
+                    )
+                field_cost += child_cost
+                field_depth += child_depth
+
+            cost += field_cost
+            depth = max(depth, field_depth)
+        return cost, depth
+
+
+def analyze_query(schema, document, operation_name=None, variables=None):
+    """Estimate the cost and depth of an operation without executing it.
+
+    Returns None when the operation cannot be selected or variables is not
+    an object, leaving the error to the executor.
+    """
+    if variables is not None and not isinstance(variables, dict):
+        return None
+    operation = get_operation_ast(document, operation_name)
+    if operation is None:
+        return None
+
+    limits = get_limits()
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if definition.kind == "fragment_definition"
+    }
+    analyzer = _Analyzer(schema, fragments, variables, limits["default_list_size"])
+    root_type = schema.get_root_type(operation.operation)
+    cost, depth = analyzer.selection(root_type, operation.selection_set)
+    return {
+        "estimated": cost,
+        "maximum": limits["max_cost"],
+        "depth": depth,
+        "maximumDepth": limits["max_depth"],
+    }
+
+
+def check_query_cost(analysis):
+    if analysis["depth"] > analysis["maximumDepth"]:
+        raise QueryCostError(
+            f"Query depth {analysis['depth']} exceeds the maximum depth "
+            f"of {analysis['maximumDepth']}",
+            "QUERY_TOO_DEEP",
+        )
+    if analysis["estimated"] > analysis["maximum"]:
+        raise QueryCostError(
+            f"Query cost {analysis['estimated']} exceeds the maximum cost "
+            f"of {analysis['maximum']}",
+            "QUERY_TOO_COMPLEX",
+        )
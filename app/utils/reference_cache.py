@@ -0,0 +1,138 @@
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class ReferenceCache:
+    """In-process cache of reference data, invalidated by version tags.
+
+    Every entry records the version of the tags it depends on when it was
+    fetched; bumping a tag invalidates all entries depending on it. Entries
+    also expire after ttl seconds, which bounds how long another worker can
+    serve data changed through a mutation it did not see. Cached values are
+    shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, max_size=10000, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._versions = {}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def versions(self, tags):
+        with self._lock:
+            return tuple(self._versions.get(tag, 0) for tag in tags)
+
+    def get(self, key, tags):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                versions, expires_at, value = entry
+                current = tuple(self._versions.get(tag, 0) for tag in tags)
+                if versions == current and expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return _MISSING
+
+    def set(self, key, versions, value):
+        with self._lock:
+            self._entries[key] = (versions, time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *tags):
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def flush(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "versions": dict(self._versions),
+            }
+
+
+reference_cache = ReferenceCache(
+    int(os.getenv("REFERENCE_CACHE_SIZE", "10000")),
+    float(os.getenv("REFERENCE_CACHE_TTL", "300")),
+)
+
+
+def cached(*tags):
+    """Cache a model function by its arguments until one of tags changes."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (fn.__module__, fn.__name__, args, tuple(sorted(kwargs.items())))
+            value = reference_cache.get(key, tags)
+            if value is _MISSING:
+                versions = reference_cache.versions(tags)
+                value = fn(*args, **kwargs)
+                reference_cache.set(key, versions, value)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def cached_batch(*tags):
+    """Cache a batch model function (keys -> dict) key by key.
+
+    Only the keys missing from the cache are fetched from the database.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(keys):
+            values = {}
+            missing = []
+            for key in keys:
+                value = reference_cache.get((fn.__module__, fn.__name__, key), tags)
+                if value is _MISSING:
+                    missing.append(key)
+                elif value is not None:
+                    values[key] = value
+
+            if missing:
+                versions = reference_cache.versions(tags)
+                fetched = fn(missing)
+                for key in missing:
+                    value = fetched.get(key)
+                    reference_cache.set(
+                        (fn.__module__, fn.__name__, key), versions, value
+                    )
+                    if value is not None:
+                        values[key] = value
+            return values
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate(*tags):
+    reference_cache.invalidate(*tags)
@@ -0,0 +1,175 @@
+import heapq
+import itertools
+import threading
+from collections import OrderedDict
+
+
+class RouteEngine:
+    """Shortest paths over a weighted undirected graph, with a route cache.
+
+    adjacency maps each node to a list of (neighbour, weight) pairs. With a
+    heuristic(node, end) that never overestimates the remaining distance,
+    paths are found with A*; without one, with Dijkstra. Computed routes are
+    kept in a bounded LRU cache: build a new engine when the graph changes.
+    """
+
+    def __init__(self, adjacency, heuristic=None, cache_size=1024):
+        self.adjacency = adjacency
+        self.heuristic = heuristic
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._routes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def shortest_path(self, start, end):
+        """Return (nodes, distance) of the shortest path, or None."""
+        return self._cached((start, end), lambda: self._search(start, end))
+
+    def _cached(self, key, search):
+        with self._lock:
+            if key in self._routes:
+                self._routes.move_to_end(key)
+                self.hits += 1
+                return self._routes[key]
+            self.misses += 1
+
+        route = search()
+
+        with self._lock:
+            self._routes[key] = route
+            while len(self._routes) > self.cache_size:
+                self._routes.popitem(last=False)
+        return route
+
+    def _search(self, start, end):
+        if start not in self.adjacency or end not in self.adjacency:
+            return None
+        heuristic = self.heuristic or (lambda node, end: 0.0)
+
+        distances = {start: 0.0}
+        previous = {}
+        # The counter breaks ties without comparing nodes
+        counter = itertools.count()
+        frontier = [(heuristic(start, end), next(counter), start)]
+        settled = set()
+        while frontier:
+            _, _, node = heapq.heappop(frontier)
+            if node in settled:
+                continue
+            if node == end:
+                path = [end]
+                while path[-1] != start:
+                    path.append(previous[path[-1]])
+                return path[::-1], distances[end]
+            settled.add(node)
+
+            for neighbour, weight in self.adjacency[node]:
+                distance = distances[node] + weight
+                if neighbour not in settled and distance < distances.get(
+                    neighbour, float("inf")
+                ):
+                    distances[neighbour] = distance
+                    previous[neighbour] = node
+                    estimate = distance + heuristic(neighbour, end)
+                    heapq.heappush(frontier, (estimate, next(counter), neighbour))
+        return None
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._routes),
+                "max_size": self.cache_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class FuelRouteEngine(RouteEngine):
+    """Shortest paths a seaplane model can fly on the fuel it carries.
+
+    Legs longer than the model's range are dropped from the graph once, when
+    the engine is built. Searches then track (distance, fuel) labels per
+    node, keeping only non-dominated ones: fuel decreases along each leg and
+    is topped up to capacity when landing at one of refuel_ports (every node
+    when None).
+    """
+
+    def __init__(
+        self,
+        adjacency,
+        fuel_capacity,
+        fuel_consumption,
+        heuristic=None,
+        cache_size=1024,
+        refuel_ports=None,
+    ):
+        self.fuel_capacity = fuel_capacity
+        self.fuel_consumption = fuel_consumption
+        self.max_range = fuel_capacity / fuel_consumption
+        self.refuel_ports = refuel_ports
+        legs = {
+            node: [(n, weight) for n, weight in edges if weight <= self.max_range]
+            for node, edges in adjacency.items()
+        }
+        super().__init__(legs, heuristic, cache_size)
+
+    def shortest_path(self, start, end, fuel=None):
+        """Return (nodes, distance) of the shortest flyable path, or None.
+
+        fuel is the fuel on board at start, a full tank by default.
+        """
+        fuel = self.fuel_capacity if fuel is None else min(fuel, self.fuel_capacity)
+        return self._cached(
+            (start, end, fuel), lambda: self._fuel_search(start, end, fuel)
+        )
+
+    def _refuels_at(self, node):
+        return self.refuel_ports is None or node in self.refuel_ports
+
+    def _fuel_search(self, start, end, fuel):
+        if start not in self.adjacency or end not in self.adjacency:
+            return None
+        heuristic = self.heuristic or (lambda node, end: 0.0)
+
+        # Labels are (node, distance, fuel, previous label)
+        labels = {start: [(0.0, fuel)]}
+        counter = itertools.count()
+        frontier = [(heuristic(start, end), next(counter), (start, 0.0, fuel, None))]
+        while frontier:
+            _, _, label = heapq.heappop(frontier)
+            node, distance, fuel, _ = label
+            # Skip labels dominated since they were queued
+            if (distance, fuel) not in labels[node]:
+                continue
+            if node == end:
+                path = []
+                while label is not None:
+                    path.append(label[0])
+                    label = label[3]
+                return path[::-1], distance
+
+            for neighbour, weight in self.adjacency[node]:
+                needed = weight * self.fuel_consumption
+                if needed > fuel:
+                    continue
+                left = (
+                    self.fuel_capacity if self._refuels_at(neighbour) else fuel - needed
+                )
+                candidate = distance + weight
+
+                existing = labels.get(neighbour, [])
+                if any(d <= candidate and f >= left for d, f in existing):
+                    continue
+                labels[neighbour] = [
+                    (d, f) for d, f in existing if not (candidate <= d and left >= f)
+                ]
+                labels[neighbour].append((candidate, left))
+                estimate = candidate + heuristic(neighbour, end)
+                heapq.heappush(
+                    frontier,
+                    (estimate, next(counter), (neighbour, candidate, left, label)),
+                )
+        return None
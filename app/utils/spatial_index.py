@@ -0,0 +1,110 @@
+import heapq
+import math
+
+import numpy as np
+
+from utils.harvesine import EARTH_RADIUS_KM
+
+LEAF_SIZE = 16
+
+
+def _unit_vectors(latitudes, longitudes):
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon = np.radians(np.asarray(longitudes, dtype=np.float64))
+    return np.column_stack(
+        (np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat))
+    )
+
+
+def _chord(distance_km):
+    # Straight-line distance between two points of the unit sphere
+    return 2 * math.sin(min(distance_km / (2 * EARTH_RADIUS_KM), math.pi / 2))
+
+
+def _great_circle_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2, 1))
+
+
+class SphereKDTree:
+    """KD-tree over latitude/longitude points for nearest and radius queries.
+
+    Points are indexed as 3D unit vectors: the chord between two of them
+    grows with their great-circle distance, so the tree can prune on plain
+    Euclidean bounds and queries visit O(log n + k) nodes instead of every
+    point.
+    """
+
+    def __init__(self, latitudes, longitudes):
+        self.points = _unit_vectors(latitudes, longitudes)
+        self.nodes = []
+        self.root = None
+        if len(self.points):
+            self.root = self._build(np.arange(len(self.points)))
+
+    def __len__(self):
+        return len(self.points)
+
+    def _build(self, indices):
+        points = self.points[indices]
+        if len(indices) <= LEAF_SIZE:
+            self.nodes.append((None, None, indices, points))
+            return len(self.nodes) - 1
+
+        axis = int(np.argmax(points.max(axis=0) - points.min(axis=0)))
+        order = np.argsort(points[:, axis], kind="stable")
+        middle = len(order) // 2
+        split = float(points[order[middle], axis])
+        left = self._build(indices[order[:middle]])
+        right = self._build(indices[order[middle:]])
+        self.nodes.append((axis, split, left, right))
+        return len(self.nodes) - 1
+
+    def query(self, latitude, longitude, k=None, max_distance_km=None):
+        """Return (index, distance_km) pairs of the closest points, closest first.
+
+        k bounds the number of results and max_distance_km their distance;
+        without either, every point is returned.
+        """
+        if self.root is None or k == 0:
+            return []
+        target = _unit_vectors([latitude], [longitude])[0]
+        bound = math.inf if max_distance_km is None else _chord(max_distance_km)
+
+        # Max-heap of the best candidates, as (-chord, index)
+        best = []
+
+        def worst():
+            if k is not None and len(best) == k:
+                return min(-best[0][0], bound)
+            return bound
+
+        # Nodes to visit with a lower bound of their distance to the target
+        stack = [(self.root, 0.0)]
+        while stack:
+            node, lower_bound = stack.pop()
+            if lower_bound > worst():
+                continue
+            node = self.nodes[node]
+            if node[0] is None:
+                _, _, indices, points = node
+                chords = np.sqrt(((points - target) ** 2).sum(axis=1))
+                for index, chord in zip(indices.tolist(), chords.tolist()):
+                    if chord > worst():
+                        continue
+                    if k is not None and len(best) == k:
+                        heapq.heapreplace(best, (-chord, index))
+                    else:
+                        heapq.heappush(best, (-chord, index))
+                continue
+
+            axis, split, left, right = node
+            difference = target[axis] - split
+            near, far = (left, right) if difference < 0 else (right, left)
+            # Visit the near side first: pushed last, popped first
+            stack.append((far, max(lower_bound, abs(difference))))
+            stack.append((near, lower_bound))
+
+        results = sorted((-chord, index) for chord, index in best)
+        chords = np.array([chord for chord, _ in results])
+        distances = _great_circle_km(chords).tolist() if results else []
+        return [(index, d) for (_, index), d in zip(results, distances)]
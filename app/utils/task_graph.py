@@ -0,0 +1,86 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def topological_waves(dependencies):
+    """Group tasks in waves, each depending only on tasks of earlier waves.
+
+    dependencies maps each task to the tasks it depends on; tasks keep
+    their declaration order within a wave. Raises ValueError on unknown
+    dependencies and cycles.
+    """
+    for name, requires in dependencies.items():
+        unknown = [
+            dependency for dependency in requires if dependency not in dependencies
+        ]
+        if unknown:
+            raise ValueError(f"'{name}' depends on unknown tasks {unknown}")
+
+    waves = []
+    placed = set()
+    remaining = list(dependencies)
+    while remaining:
+        wave = [name for name in remaining if placed.issuperset(dependencies[name])]
+        if not wave:
+            raise ValueError(f"Dependency cycle between {remaining}")
+        waves.append(wave)
+        placed.update(wave)
+        remaining = [name for name in remaining if name not in placed]
+    return waves
+
+
+def _run_timed(task):
+    started = time.perf_counter()
+    try:
+        outcome = {"status": "done", "result": task()}
+    except Exception as e:
+        outcome = {"status": "failed", "error": e}
+    outcome["seconds"] = time.perf_counter() - started
+    return outcome
+
+
+def run_task_graph(tasks, dependencies, max_workers=4, on_complete=None):
+    """Run each task once the tasks it depends on are done.
+
+    tasks maps names to callables and dependencies names to the names they
+    depend on. Independent tasks run concurrently on a thread pool. A failed
+    task does not stop the others, but the tasks depending on it are
+    skipped. on_complete(name, outcome) is called from the calling thread
+    as tasks finish. Returns name -> outcome, a dict with the status
+    ("done", "failed" or "skipped"), the duration in seconds and either
+    the task's result or its error.
+    """
+    order = [name for wave in topological_waves(dependencies) for name in wave]
+    outcomes = {}
+
+    def finish(name, outcome):
+        outcomes[name] = outcome
+        if on_complete is not None:
+            on_complete(name, outcome)
+
+    pending = list(order)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            # In topological order, so skipped tasks skip their dependents
+            for name in list(pending):
+                requires = dependencies[name]
+                failed = [
+                    dependency
+                    for dependency in requires
+                    if outcomes.get(dependency, {}).get("status")
+                    in ("failed", "skipped")
+                ]
+                if failed:
+                    pending.remove(name)
+                    error = RuntimeError(f"{', '.join(failed)} did not complete")
+                    finish(name, {"status": "skipped", "error": error, "seconds": 0.0})
+                elif all(dependency in outcomes for dependency in requires):
+                    pending.remove(name)
+                    running[pool.submit(_run_timed, tasks[name])] = name
+
+            if running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(running.pop(future), future.result())
+    return outcomes
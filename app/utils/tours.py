@@ -0,0 +1,95 @@
+import math
+import time
+
+
+def path_length(path, distances):
+    return sum(distances[a][b] for a, b in zip(path, path[1:]))
+
+
+def _leg(distances, a, b):
+    # Open paths end anywhere: leaving the last stop is free
+    return 0.0 if b is None else distances[a][b]
+
+
+def two_opt(path, distances, max_leg=math.inf, deadline=None):
+    """Improve an open path in place by reversing segments; path[0] is fixed.
+
+    Returns True if the path was shortened. Moves creating a leg longer than
+    max_leg are skipped.
+    """
+    improved = False
+    n = len(path)
+    for i in range(1, n - 1):
+        if deadline is not None and time.monotonic() > deadline:
+            break
+        for j in range(i + 1, n):
+            a, b = path[i - 1], path[i]
+            c, d = path[j], path[j + 1] if j + 1 < n else None
+            before = distances[a][b] + _leg(distances, c, d)
+            after = distances[a][c] + _leg(distances, b, d)
+            if after < before - 1e-9 and distances[a][c] <= max_leg:
+                if d is not None and distances[b][d] > max_leg:
+                    continue
+                path[i : j + 1] = path[i : j + 1][::-1]
+                improved = True
+    return improved
+
+
+def or_opt(path, distances, max_leg=math.inf, deadline=None, max_segment=3):
+    """Improve an open path in place by moving short segments; path[0] is fixed.
+
+    Returns True if the path was shortened.
+    """
+    improved = False
+    for size in range(1, max_segment + 1):
+        i = 1
+        while i + size <= len(path):
+            if deadline is not None and time.monotonic() > deadline:
+                return improved
+            segment = path[i : i + size]
+            prev, after = path[i - 1], path[i + size] if i + size < len(path) else None
+            removed = (
+                distances[prev][segment[0]]
+                + _leg(distances, segment[-1], after)
+                - _leg(distances, prev, after)
+            )
+            rest = path[:i] + path[i + size :]
+
+            best_gain, best_at = 1e-9, None
+            for k in range(len(rest)):
+                if k == i - 1:
+                    continue
+                a, b = rest[k], rest[k + 1] if k + 1 < len(rest) else None
+                if distances[a][segment[0]] > max_leg:
+                    continue
+                if b is not None and distances[segment[-1]][b] > max_leg:
+                    continue
+                added = (
+                    distances[a][segment[0]]
+                    + _leg(distances, segment[-1], b)
+                    - _leg(distances, a, b)
+                )
+                if removed - added > best_gain:
+                    best_gain, best_at = removed - added, k
+            if best_at is not None and (
+                after is None or distances[prev][after] <= max_leg
+            ):
+                path[:] = rest[: best_at + 1] + segment + rest[best_at + 1 :]
+                improved = True
+            else:
+                i += 1
+    return improved
+
+
+def improve_path(path, distances, max_leg=math.inf, deadline=None):
+    """Apply 2-opt and or-opt until neither helps or the deadline passes.
+
+    Returns True when the path is a local optimum, False when the deadline
+    stopped the search.
+    """
+    while two_opt(path, distances, max_leg, deadline) | or_opt(
+        path, distances, max_leg, deadline
+    ):
+        if deadline is not None and time.monotonic() > deadline:
+            return False
+    return deadline is None or time.monotonic() <= deadline
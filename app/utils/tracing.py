@@ -0,0 +1,153 @@
+import bisect
+import hashlib
+import json
+import threading
+import time
+from contextvars import ContextVar
+
+from ariadne.types import Extension
+
+# Requests sending this header get their trace in extensions.tracing
+DEBUG_HEADER = "X-Debug-Tracing"
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_current_trace = ContextVar("current_trace", default=None)
+_current_resolver = ContextVar("current_resolver", default=None)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, duration_ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def snapshot(self):
+        buckets = {
+            f"le_{bound}": count for bound, count in zip(BUCKETS_MS, self.counts)
+        }
+        buckets["le_inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "max_ms": self.max_ms,
+            "buckets": buckets,
+        }
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def observe(name, duration_ms):
+    with _histograms_lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(duration_ms)
+
+
+def get_histograms():
+    with _histograms_lock:
+        return {name: h.snapshot() for name, h in sorted(_histograms.items())}
+
+
+def hash_parameters(parameters):
+    encoded = json.dumps(parameters, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def record_db_call(database, query, parameters, rows, start, duration_ms):
+    """Record a database call made by the current request, if any.
+
+    start is a time.perf_counter() value, the call is always counted in the
+    database's latency histogram.
+    """
+    observe(database, duration_ms)
+
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    call = {
+        "database": database,
+        "query": query,
+        "parametersHash": hash_parameters(parameters),
+        "rows": rows,
+        "startOffset": (start - trace["start"]) * 1000,
+        "duration": duration_ms,
+    }
+    resolver = _current_resolver.get()
+    if resolver is not None:
+        resolver["calls"].append(call)
+    else:
+        trace["calls"].append(call)
+
+
+class TracingExtension(Extension):
+    """Time every resolver and the database calls made underneath it."""
+
+    def __init__(self):
+        self.trace = None
+        self._token = None
+
+    def request_started(self, context):
+        self.trace = {
+            "start": time.perf_counter(),
+            "startTime": time.time(),
+            "resolvers": [],
+            "calls": [],
+        }
+        self._token = _current_trace.set(self.trace)
+
+    def request_finished(self, context):
+        if self._token is not None:
+            _current_trace.reset(self._token)
+            self._token = None
+
+    def resolve(self, next_, obj, info, **kwargs):
+        # Default resolvers only read a property and meta fields such as
+        # __typename are not part of the type: do not time them
+        field = info.parent_type.fields.get(info.field_name)
+        if field is None or field.resolve is None:
+            return next_(obj, info, **kwargs)
+
+        resolver = {
+            "path": info.path.as_list(),
+            "parentType": info.parent_type.name,
+            "fieldName": info.field_name,
+            "calls": [],
+        }
+        token = _current_resolver.set(resolver)
+        start = time.perf_counter()
+        try:
+            return next_(obj, info, **kwargs)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            _current_resolver.reset(token)
+            resolver["startOffset"] = (start - self.trace["start"]) * 1000
+            resolver["duration"] = duration_ms
+            self.trace["resolvers"].append(resolver)
+            observe(f"resolver.{info.parent_type.name}.{info.field_name}", duration_ms)
+
+    def format(self, context):
+        request = context.get("request") if isinstance(context, dict) else None
+        if request is None or not request.headers.get(DEBUG_HEADER):
+            return None
+        # Called before request_finished, while the response is being built
+        duration_ms = (time.perf_counter() - self.trace["start"]) * 1000
+        return {
+            "tracing": {
+                "startTime": self.trace["startTime"],
+                "duration": duration_ms,
+                "resolvers": self.trace["resolvers"],
+                "calls": self.trace["calls"],
+            }
+        }